@@ -1,4 +1,5 @@
 # Third-party modules
+import scipy.optimize as so
 import scipy.signal as ss
 import numpy as np
 
@@ -6,8 +7,34 @@ import numpy as np
 from enum import Enum
 from functools import partial
 
+# filters-tool project modules
+from app.approximators.prototypes import PROTOTYPE_CACHE
+
 # Constant Values
 MAXIMUM_ORDER = 25
+CROSSING_TOLERANCE = 1e-9       # Relative tolerance of the frequencies found by root finding
+CROSSING_SAMPLES = 16           # Logarithmic samples used to bracket the first crossing
+CROSSING_REFINEMENTS = 3        # Times the bracket is sampled again before root finding
+TEMPLATE_TOLERANCE = 1e-6       # Tolerance in dB when verifying the attenuations of a template
+
+# Parameters of an attenuation template, used as keys when describing templates
+# outside of an approximator object, and their default values
+TEMPLATE_PARAMETERS = {
+    'type': 'low-pass',
+    'gain': 0,
+    'fpl': 0, 'fpr': 0, 'fal': 0, 'far': 0,
+    'Apl': 0, 'Apr': 0, 'Aal': 0, 'Aar': 0,
+    'denorm': 0, 'ord': 0, 'q': 0
+}
+
+# Parameters of a group delay template and their default values
+GROUP_DELAY_PARAMETERS = {
+    'type': 'group-delay',
+    'gain': 0,
+    'fa': 0, 'Aa': 0, 'ft': 0,
+    'group_delay': 0, 'tol': 0,
+    'ord': 0, 'q': 0
+}
 
 
 class ApproximationErrorCode(Enum):
@@ -35,6 +62,117 @@ class FilterType(Enum):
     BAND_REJECT = "band-stop"
 
 
+# ---------------- #
+# Public Functions #
+# ---------------- #
+def magnitude_response(zpk, w) -> np.ndarray:
+    """ Returns the magnitude in dB of the ZerosPolesGain object evaluated at the angular frequencies w,
+    computed directly from its zeros and poles. """
+    s = 1j * np.atleast_1d(np.asarray(w, dtype=float))
+    with np.errstate(divide='ignore'):
+        log_magnitude = np.log10(abs(zpk.gain)) \
+            + np.sum(np.log10(abs(s[:, np.newaxis] - np.asarray(zpk.zeros)[np.newaxis, :])), axis=1) \
+            - np.sum(np.log10(abs(s[:, np.newaxis] - np.asarray(zpk.poles)[np.newaxis, :])), axis=1)
+    return 20 * log_magnitude
+
+
+def group_delay_response(zpk, w):
+    """ Returns the group delay of the ZerosPolesGain object evaluated at the angular frequencies w,
+    computed in closed form as the sum of the contributions of each pole minus those of each zero,
+    being -Re(p) / (Re(p)^2 + (w - Im(p))^2) the contribution of a pole p. """
+    w = np.atleast_1d(np.asarray(w, dtype=float))[:, np.newaxis]
+    poles = np.asarray(zpk.poles, dtype=complex)[np.newaxis, :]
+    zeros = np.asarray(zpk.zeros, dtype=complex)[np.newaxis, :]
+    return np.sum(-poles.real / (poles.real ** 2 + (w - poles.imag) ** 2), axis=1) \
+        - np.sum(-zeros.real / (zeros.real ** 2 + (w - zeros.imag) ** 2), axis=1)
+
+
+def find_minimum_order(predicate, seed=1, minimum=1, maximum=MAXIMUM_ORDER) -> tuple:
+    """ Returns the minimum order between minimum and maximum verifying the predicate, which must be
+    monotonic in the order (once an order verifies it, every higher order does too).
+    Starting from the seed, orders are galloped exponentially upwards or downwards until the
+    answer is bracketed, and then the bracket is bisected.
+    Returns -> (order, evaluations) with order being None when no order verifies the predicate.
+    """
+    results = {}
+
+    def verifies(order):
+        if order not in results:
+            results[order] = predicate(order)
+        return results[order]
+
+    seed = min(max(seed, minimum), maximum)
+    if verifies(seed):
+        # Galloping downwards, the low end of the bracket fails or is below the minimum
+        high, step = seed, 1
+        low = high - step
+        while low >= minimum and verifies(low):
+            high, step = low, step * 2
+            low = high - step
+        low = max(low, minimum - 1)
+    else:
+        # Galloping upwards, the high end of the bracket verifies the predicate
+        low, step = seed, 1
+        high = low + step
+        while high <= maximum and not verifies(high):
+            low, step = high, step * 2
+            high = low + step
+        if high > maximum:
+            high = maximum
+            if not verifies(high):
+                return None, len(results)
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        if verifies(middle):
+            high = middle
+        else:
+            low = middle
+    return high, len(results)
+
+
+def find_maximum_order(exceeds, minimum=1, maximum=MAXIMUM_ORDER) -> tuple:
+    """ Returns the maximum order between minimum and maximum not verifying the exceeds predicate.
+    The predicate is searched as a monotonic one with find_minimum_order, but when the evaluated orders
+    show it is not (as the maximum Q of some approximations, which falls and grows again with the order)
+    or no order was found, the orders are scanned downwards from the maximum, reusing the evaluated ones.
+    Returns -> (order, evaluations) with order being None when every order exceeds.
+    """
+    results = {}
+
+    def verifies(order):
+        if order not in results:
+            results[order] = exceeds(order)
+        return results[order]
+
+    order, _ = find_minimum_order(verifies, minimum=minimum, maximum=maximum)
+    order = maximum if order is None else order - 1
+    monotonic = not any(results[low] and not results[high] for low in results for high in results if low < high)
+    if order < minimum or not monotonic:
+        order = next((order for order in range(maximum, minimum - 1, -1) if not verifies(order)), None)
+    return order, len(results)
+
+
+def find_first_crossing(function, level, w_low, w_high, tolerance=CROSSING_TOLERANCE, samples=CROSSING_SAMPLES):
+    """ Returns the first angular frequency between w_low and w_high where the function falls to or below
+    the given level. The crossing is bracketed with logarithmic samples, refining the bracket a few times
+    so that later crossings (like the stop band ripple of Cauer touching the level) are left outside of it,
+    and then solved using Brent's method with the given relative tolerance.
+    The function should expect an array of angular frequencies.
+    Returns None if the function never falls below the level.
+    """
+    w_left, w_right = w_low, w_high
+    for refinement in range(CROSSING_REFINEMENTS):
+        w = np.geomspace(w_left, w_right, samples)
+        below = np.flatnonzero(function(w) <= level)
+        if below.size == 0:
+            return None
+        elif below[0] == 0:
+            return w[0]
+        w_left, w_right = w[below[0] - 1], w[below[0]]
+    return so.brentq(lambda x: function(x)[0] - level, w_left, w_right, xtol=tolerance * w_left)
+
+
 # noinspection PyAttributeOutsideInit,PyUnresolvedReferences
 class AttFilterApproximator:
     def __init__(self):
@@ -68,6 +206,7 @@ class AttFilterApproximator:
         self.h_norm = None
         self.h_denorm = None
         self.error_code = None
+        self.orders_evaluated = 0
 
     def get_norm_template(self) -> tuple:
         """ Returns a 4-element tuple containing the normalised
@@ -75,6 +214,10 @@ class AttFilterApproximator:
         Returns -> (wa, aa, wp, ap)
         """
         return self._normalised_template()
+
+    def get_norm_pass_band_edge(self) -> float:
+        """ Returns the normalised angular frequency where the pass band ends, wp in the normalised template. """
+        return self._normalised_template()[2]
     
     def get_normalised_zpk(self):
         """ Returns a tuple of three elements containing Zeros, Poles and Gain,
@@ -105,62 +248,73 @@ class AttFilterApproximator:
         if error_code is ApproximationErrorCode.OK:
 
             # Verifying if valid filter type is given
-            if self.type == FilterType.LOW_PASS.value:
-                error_code = self.validate_low_pass()
-            elif self.type == FilterType.HIGH_PASS.value:
-                error_code = self.validate_high_pass()
-            elif self.type == FilterType.BAND_PASS.value:
-                error_code = self.validate_band_pass()
-            elif self.type == FilterType.BAND_REJECT.value:
-                error_code = self.validate_band_stop()
-            else:
-                error_code = ApproximationErrorCode.INVALID_TYPE
+            error_code = self._validate_type()
 
             # Finding the transfer function for the given parameters
             if error_code is ApproximationErrorCode.OK:
                 self.adjust_symmetry_condition()
-                
-                # When using a maximum Q value, iterates with fixed orders
-                # and verifies if matches...
-                begin_order = 1 if self.q > 0 else self.ord
-                end_order = MAXIMUM_ORDER if self.q > 0 else self.ord
-                for order in range(end_order, begin_order - 1, -1):
-                    self.ord = order
-
-                    # Normalising the filter template, choosing design mode between fixed order or
-                    # a template based design, trying to match the given parameters
-                    wan, aa, wpn, ap = self.get_norm_template()
-                    if self.ord > 0:
-                        try:
-                            error_code = self.compute_normalised_by_order(ap, self.ord, aa)
-                        except NotImplementedError:
-                            error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
-                    else:
-                        error_code = self.compute_normalised_by_template(ap, aa, wpn, wan)
-
-                    # If maxima
-                    
-                    # Denormalisation process, first we need to pass every transfer function
-                    # to a TrasnferFunction object, using that apply the denormalisation
-                    # algorithm of scipy.signal... finally translating ir to a ZeroPolesGain object!
-                    if error_code is ApproximationErrorCode.OK:
-                        error_code = self._denormalised_transfer_function()
-
-                        # If using the Q maximum value mode of design, check if valid h_denorm
-                        if error_code is ApproximationErrorCode.OK:
-                            if self.q > 0:
-                                if self.matches_selectivity(self.q, self.h_denorm):
-                                    break
-                        else:
-                            break
+
+                # When using a maximum Q value, searches the highest order not exceeding it
+                if self.q > 0:
+                    error_code = self._compute_by_selectivity()
                 else:
-                    if self.q > 0:
-                        error_code = ApproximationErrorCode.MAXIMUM_ORDER_REACHED
+                    self.orders_evaluated = 1
+                    error_code = self._compute_design()
 
         # Returning the error code and storing it in the class
         self.error_code = error_code
         return error_code
-    
+
+    def compute_batch(self, specs) -> list:
+        """ Computes the transfer function of every template given in specs, without modifying
+        the parameters of this approximator. Templates can be given as a sequence of dictionaries,
+        a dictionary of columns or a NumPy record array, using the names of TEMPLATE_PARAMETERS,
+        missing parameters take their default value.
+        Templates sharing the same normalised design compute the normalised transfer function only once,
+        and then are denormalised to their own frequencies and gain.
+        Returns -> [(zpk, order, error_code), ...] with zpk being None when not computed!
+        """
+        templates = self._load_batch(specs)
+        error_codes = self._validate_batch(templates)
+
+        worker = type(self)()
+        designs = {}
+        results = []
+        for template, error_code in zip(templates, error_codes):
+            if error_code is ApproximationErrorCode.OK:
+                worker.reset_parameters()
+                worker.set_parameters(template)
+
+                # Templates designed by maximum Q need the denormalised transfer function
+                # to choose the order, so they cannot share the normalised design
+                key = worker._normalised_design_key()
+                if key in designs:
+                    error_code = worker._validate_type()
+                    if error_code is ApproximationErrorCode.OK:
+                        h_norm = designs[key]
+                        worker.adjust_symmetry_condition()
+                        worker.h_aux = ss.ZerosPolesGain(h_norm.zeros, h_norm.poles, h_norm.gain)
+                        worker.h_norm = ss.ZerosPolesGain(h_norm.zeros, h_norm.poles, h_norm.gain)
+                        error_code = worker._frequency_transformation()
+                else:
+                    error_code = worker.compute()
+                    if error_code is ApproximationErrorCode.OK and key is not None:
+                        designs[key] = worker.h_norm
+
+            if error_code is ApproximationErrorCode.OK:
+                zpk = worker.get_zpk()
+                results.append((ss.ZerosPolesGain(zpk.zeros, zpk.poles, zpk.gain), len(worker.h_norm.poles), error_code))
+            else:
+                results.append((None, 0, error_code))
+        return results
+
+    def set_parameters(self, template: dict):
+        """ Loads the parameters of the approximation from a dictionary using
+        the names of TEMPLATE_PARAMETERS, unknown keys are ignored. """
+        for name, value in template.items():
+            if name in TEMPLATE_PARAMETERS:
+                setattr(self, name, value)
+
     # ------------------------- #
     # Internal Public Methods   #
     # ------------------------- #
@@ -192,7 +346,23 @@ class AttFilterApproximator:
 
     def compute_normalised_by_template(self, ap, aa, wpn, wan) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the normalised template """
-        return self._compute_normalised_by_match(ap, aa, partial(self.matches_normalised_template, ap, aa, wan))
+        return self._compute_normalised_by_match(
+            ap, aa,
+            partial(self.matches_normalised_template, ap, aa, wan),
+            self.estimate_order(ap, aa, wpn, wan)
+        )
+
+    def get_prototype(self, order, ap, aa, builder) -> ss.ZerosPolesGain:
+        """ Returns the normalised prototype of the approximation for the order and attenuations given,
+        using the shared prototype cache, the builder callback should return (zeros, poles, gain).
+        Attenuations not used by the approximation should be given as None. """
+        zeros, poles, gain = PROTOTYPE_CACHE.get_prototype((type(self).__name__, order, ap, aa), builder)
+        return ss.ZerosPolesGain(zeros, poles, gain)
+
+    def estimate_order(self, ap, aa, wpn, wan) -> int:
+        """ Returns an estimation of the order needed to verify the normalised template, used
+        to start searching the order. Approximations without a known estimator start from the first order. """
+        return 1
 
     def compute_normalised_by_order(self, ap, n, aa) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
@@ -230,12 +400,11 @@ class AttFilterApproximator:
         """ Returns the denormalisation factor to be used when
         adjusting the zeros and poles of the transfer function between the transition
         band. """
+        relative_adjust = 1
         if self.q == 0 and self.ord == 0:
-            w_values, mag_values, _ = ss.bode(self.h_aux, w=np.linspace(wp / 10, wa * 5, num=100000))
-            stop_band = [w for w, mag in zip(w_values, mag_values) if mag <= (-aa)]
-            relative_adjust = ((wa - stop_band[0]) / stop_band[0]) * (self.denorm / 100) + 1
-        else:
-            relative_adjust = 1
+            stop_band = find_first_crossing(partial(magnitude_response, self.h_aux), -aa, wp / 10, wa * 5)
+            if stop_band is not None:
+                relative_adjust = ((wa - stop_band) / stop_band) * (self.denorm / 100) + 1
 
         return relative_adjust
 
@@ -260,6 +429,14 @@ class AttFilterApproximator:
     # ----------------- #
     def _denormalised_transfer_function(self) -> ApproximationErrorCode:
         """ Denormalises the transfer function returned by the approximation used. """
+        error_code = self._normalised_transfer_function()
+        if error_code is ApproximationErrorCode.OK:
+            error_code = self._frequency_transformation()
+        return error_code
+
+    def _normalised_transfer_function(self) -> ApproximationErrorCode:
+        """ Moves the normalised transfer function between the transition band, and stores
+        it as the final normalised transfer function. """
 
         # Unity gain of the normalised transfer function, factor of denormalisation...
         # moving it between the transition band
@@ -276,6 +453,11 @@ class AttFilterApproximator:
 
         # Final normalised transfer function being stored, keep working on auxiliar transfer function
         self.h_norm = ss.ZerosPolesGain(self.h_aux.zeros, self.h_aux.poles, self.h_aux.gain)
+        return ApproximationErrorCode.OK
+
+    def _frequency_transformation(self) -> ApproximationErrorCode:
+        """ Applies the gain and the frequency transformation to the auxiliar transfer function,
+        storing the denormalised transfer function. """
         self.adjust_function_gain(10 ** (self.gain / 20))
 
         # Frequency transformation to get the desired filter
@@ -291,26 +473,138 @@ class AttFilterApproximator:
 
         return ApproximationErrorCode.OK
 
-    def _compute_normalised_by_match(self, ap, aa, callback) -> ApproximationErrorCode:
-        """ Generates normalised transfer function for each order until the callbacks
-        verifies it matches the requierements. 
+    def _compute_normalised_by_match(self, ap, aa, callback, seed=1) -> ApproximationErrorCode:
+        """ Generates normalised transfer function with the minimum order that the callback
+        verifies it matches the requierements, searching orders from the seed given.
         The callback should expect a ZerosPoleGain object from Scipy.Signal,
-        returning whether it verifies or not the requirements. """
-        for order in range(1, MAXIMUM_ORDER + 1):
+        returning whether it verifies or not the requirements, and it must be monotonic in the order. """
+        designs = {}
+        errors = []
+
+        def matches(order):
             try:
                 error_code = self.compute_normalised_by_order(ap, order, aa)
             except NotImplementedError:
                 error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
 
-            if error_code is ApproximationErrorCode.OK:
-                if callback(self.h_aux):
-                    return ApproximationErrorCode.OK
-                else:
-                    self.h_aux = None
-            else:
-                return error_code
-        else:
+            # Errors do not depend on the order, so stop searching
+            if error_code is not ApproximationErrorCode.OK:
+                errors.append(error_code)
+                return True
+            designs[order] = self.h_aux
+            return callback(self.h_aux)
+
+        order, self.orders_evaluated = find_minimum_order(matches, seed)
+        if errors:
+            return errors[0]
+        elif order is None:
+            self.h_aux = None
             return ApproximationErrorCode.MAXIMUM_ORDER_REACHED
+        else:
+            self.h_aux = designs[order]
+            return ApproximationErrorCode.OK
+
+    def _compute_design(self) -> ApproximationErrorCode:
+        """ Computes the normalised and denormalised transfer functions, using the fixed order
+        when given or a template based design otherwise. """
+        # Normalising the filter template, choosing design mode between fixed order or
+        # a template based design, trying to match the given parameters
+        wan, aa, wpn, ap = self.get_norm_template()
+        if self.ord > 0:
+            try:
+                error_code = self.compute_normalised_by_order(ap, self.ord, aa)
+            except NotImplementedError:
+                error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
+        else:
+            error_code = self.compute_normalised_by_template(ap, aa, wpn, wan)
+
+        # Denormalisation process, first we need to pass every transfer function
+        # to a TrasnferFunction object, using that apply the denormalisation
+        # algorithm of scipy.signal... finally translating ir to a ZeroPolesGain object!
+        if error_code is ApproximationErrorCode.OK:
+            error_code = self._denormalised_transfer_function()
+        return error_code
+
+    def _compute_by_selectivity(self) -> ApproximationErrorCode:
+        """ Computes the transfer function with the highest order whose poles do not exceed the
+        maximum selectivity. The maximum Q of the poles usually grows with the order, so the answer is searched
+        with find_maximum_order, and the amount of designs is stored in orders_evaluated. """
+        designs = {}
+
+        def exceeds(order):
+            self.ord = order
+            error_code = self._compute_design()
+            designs[order] = (error_code, self.h_aux, self.h_norm, self.h_denorm)
+
+            # Errors stop the search, as lower orders are preferred
+            return error_code is not ApproximationErrorCode.OK or not self.matches_selectivity(self.q, self.h_denorm)
+
+        order, self.orders_evaluated = find_maximum_order(exceeds)
+        if order is None:
+            self.ord = 1
+            error_code = designs[1][0]
+            return ApproximationErrorCode.MAXIMUM_ORDER_REACHED if error_code is ApproximationErrorCode.OK else error_code
+
+        self.ord = order
+        error_code, self.h_aux, self.h_norm, self.h_denorm = designs[order]
+        return error_code
+
+    def _normalised_design_key(self):
+        """ Returns a hashable key identifying the normalised transfer function that would be
+        computed with the current parameters, or None when it cannot be shared between templates.
+        """
+        if self.q > 0:
+            return None
+
+        # Symmetry condition modifies the template, so it is applied over a copy of the parameters
+        frequencies = self.fpl, self.fpr, self.fal, self.far
+        self.adjust_symmetry_condition()
+        template = self.get_norm_template()
+        self.fpl, self.fpr, self.fal, self.far = frequencies
+        return self.type, self.ord, self.denorm, template
+
+    def _validate_type(self) -> ApproximationErrorCode:
+        """ Returns whether the parameters are valid for the filter type, or if the filter type is not valid. """
+        if self.type == FilterType.LOW_PASS.value:
+            return self.validate_low_pass()
+        elif self.type == FilterType.HIGH_PASS.value:
+            return self.validate_high_pass()
+        elif self.type == FilterType.BAND_PASS.value:
+            return self.validate_band_pass()
+        elif self.type == FilterType.BAND_REJECT.value:
+            return self.validate_band_stop()
+        else:
+            return ApproximationErrorCode.INVALID_TYPE
+
+    def _validate_batch(self, templates: list) -> list:
+        """ Validates the general parameters and the filter type of a batch of templates at once,
+        the remaining validation is specific of each filter type and approximation.
+        Returns -> [error_code, ...]
+        """
+        def load_column(name):
+            # Non numeric values are loaded as NaN, so they never verify any condition
+            values = [template.get(name, TEMPLATE_PARAMETERS[name]) for template in templates]
+            return np.array([value if isinstance(value, (int, float, np.number)) else np.nan for value in values], dtype=float)
+
+        gain, order, q, denorm = load_column('gain'), load_column('ord'), load_column('q'), load_column('denorm')
+        types = np.array([template.get('type', TEMPLATE_PARAMETERS['type']) for template in templates], dtype=object)
+
+        with np.errstate(invalid='ignore'):
+            conditions = [
+                ~(gain >= 0),
+                ~((order >= 0) & (order <= MAXIMUM_ORDER)),
+                ~(q >= 0),
+                ~((denorm >= 0) & (denorm <= 100)),
+                ~np.isin(types, [filter_type.value for filter_type in FilterType])
+            ]
+        choices = [
+            ApproximationErrorCode.INVALID_GAIN,
+            ApproximationErrorCode.INVALID_ORDER,
+            ApproximationErrorCode.INVALID_Q,
+            ApproximationErrorCode.INVALID_DENORM,
+            ApproximationErrorCode.INVALID_TYPE
+        ]
+        return list(np.select(conditions, choices, default=ApproximationErrorCode.OK))
 
     def _normalised_template(self) -> tuple:
         """ Given the filter type and its parameters, it returns
@@ -458,6 +752,19 @@ class AttFilterApproximator:
     # ---------------- #
     #  Static Methods  #
     # ---------------- #
+    @staticmethod
+    def _load_batch(specs) -> list:
+        """ Returns the templates of a batch as a list of dictionaries, given a sequence of
+        dictionaries, a dictionary of columns or a NumPy record array. """
+        if isinstance(specs, np.ndarray) and specs.dtype.names is not None:
+            return [{name: record[name].item() for name in specs.dtype.names} for record in specs.ravel()]
+        elif isinstance(specs, dict):
+            columns = {name: list(np.ravel(values)) for name, values in specs.items()}
+            length = max([len(values) for values in columns.values()], default=0)
+            return [{name: values[index] for name, values in columns.items()} for index in range(length)]
+        else:
+            return [dict(template) for template in specs]
+
     @staticmethod
     def calculate_xi(root):
         k = (root.imag / root.real) ** 2
@@ -480,8 +787,10 @@ class AttFilterApproximator:
         if zpk is None:
             return False
 
-        _, mag, _ = ss.bode(zpk, w=[1, wa])
-        return mag[0] >= -ap and mag[1] <= -aa
+        # Approximations designed with an exact pass band attenuation of ap,
+        # fall in the edge of the template, so a tolerance is needed
+        mag = magnitude_response(zpk, [1, wa])
+        return mag[0] >= -ap - TEMPLATE_TOLERANCE and mag[1] <= -aa + TEMPLATE_TOLERANCE
 
     @staticmethod
     def matches_selectivity(max_q, zpk) -> bool:
@@ -525,6 +834,7 @@ class GroupDelayFilterApproximator():
         self.h_denorm = None
         self.error_code = None
         self.denorm_order = 0
+        self.orders_evaluated = 0
 
     def compute(self):
         """ Computes the transfer function with the filled parameters
@@ -533,40 +843,12 @@ class GroupDelayFilterApproximator():
         error_code = self._validate()
         if(error_code == ApproximationErrorCode.OK):
             # if data isa valid, calculate approximation
-            # When using a maximum Q value, iterates with fixed orders
-            # and verifies if matches...
-            begin_order = 1 if self.q > 0 else self.ord
-            end_order = MAXIMUM_ORDER if self.q > 0 else self.ord
-            for order in range(end_order, begin_order - 1, -1):
-                self.ord = order
-
-                # Normalising the filter template, choosing design mode between fixed order or
-                # a template based design, trying to match the given parameters
-                wan, aa, wfn, gdn, tolerance = self._normalised_template()
-                if self.ord > 0:
-                    try:
-                        error_code = self.compute_normalised_by_order(gdn, wfn, self.ord)
-                        self.denorm_order = self.ord
-                    except NotImplementedError:
-                        error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
-                else:
-                    error_code = self.compute_normalised_by_template(gdn, wfn, aa, wan, tolerance)
-
-                # If maxima
-
-                # Denormalisation process, first we need to pass every transfer function
-                # to a TrasnferFunction object, using that apply the denormalisation
-                # algorithm of scipy.signal... finally translating ir to a ZeroPolesGain object!
-                if error_code is ApproximationErrorCode.OK:
-                    error_code = self._denormalised_transfer_function()
-
-                    # If using the Q maximum value mode of design, check if valid h_denorm
-                    if error_code is ApproximationErrorCode.OK:
-                        if self.q > 0:
-                            if self.matches_selectivity(self.q, self.h_denorm):
-                                break
-                    else:
-                        break
+            # When using a maximum Q value, searches the highest order not exceeding it
+            if self.q > 0:
+                error_code = self._compute_by_selectivity()
+            else:
+                self.orders_evaluated = 1
+                error_code = self._compute_design()
 
         # if data is not valid, return error code
         else:
@@ -575,6 +857,13 @@ class GroupDelayFilterApproximator():
         self.error_code = error_code
         return error_code
 
+    def set_parameters(self, template: dict):
+        """ Loads the parameters of the approximation from a dictionary using
+        the names of GROUP_DELAY_PARAMETERS, unknown keys are ignored. """
+        for name, value in template.items():
+            if name in GROUP_DELAY_PARAMETERS:
+                setattr(self, name, value)
+
     def get_norm_template(self) -> tuple:
         """ Returns a 4-element tuple containing the normalised
         parameters of the template.
@@ -583,6 +872,11 @@ class GroupDelayFilterApproximator():
         wan, aa, wfn, gdn, tolerance = self._normalised_template()
         return wan, aa, 0, 0
 
+    def get_norm_pass_band_edge(self) -> float:
+        """ Returns the normalised angular frequency where the pass band ends, up to which the group delay
+        is kept within the tolerance, wfn in the normalised template. """
+        return self._normalised_template()[2]
+
     def get_normalised_zpk(self):
         """ Returns a tuple of three elements containing Zeros, Poles and Gain,
         of the normalised transfer function.
@@ -615,6 +909,12 @@ class GroupDelayFilterApproximator():
         """ Generates normalised transfer function prioritising the fixed order """
         raise NotImplementedError
 
+    def get_prototype(self, order, gdn, builder) -> ss.ZerosPolesGain:
+        """ Returns the normalised prototype of the approximation for the order and group delay given,
+        using the shared prototype cache, the builder callback should return (zeros, poles, gain). """
+        zeros, poles, gain = PROTOTYPE_CACHE.get_prototype((type(self).__name__, order, gdn, None), builder)
+        return ss.ZerosPolesGain(zeros, poles, gain)
+
     # -----------------#
     # Private Methods #
     # -----------------#
@@ -643,27 +943,81 @@ class GroupDelayFilterApproximator():
         else:
             return ApproximationErrorCode.OK
 
-    def _compute_normalised_by_match(self, gdn, wfn, tolerance, callback) -> ApproximationErrorCode:
-        """ Generates normalised transfer function for each order until the callbacks
-        verifies it matches the requierements.
+    def _compute_normalised_by_match(self, gdn, wfn, tolerance, callback, seed=1) -> ApproximationErrorCode:
+        """ Generates normalised transfer function with the minimum order that the callback
+        verifies it matches the requierements, searching orders from the seed given.
         The callback should expect a ZerosPoleGain object from Scipy.Signal,
-        returning whether it verifies or not the requirements. """
-        for order in range(1, MAXIMUM_ORDER + 1):
+        returning whether it verifies or not the requirements, and it must be monotonic in the order. """
+        designs = {}
+        errors = []
+
+        def matches(order):
             try:
                 error_code = self.compute_normalised_by_order(gdn, wfn, order)
             except NotImplementedError:
                 error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
 
-            if error_code is ApproximationErrorCode.OK:
-                if callback(self.h_norm):
-                    self.denorm_order = order
-                    return ApproximationErrorCode.OK
-                else:
-                    self.h_norm = None
-            else:
-                return error_code
-        else:
+            # Errors do not depend on the order, so stop searching
+            if error_code is not ApproximationErrorCode.OK:
+                errors.append(error_code)
+                return True
+            designs[order] = self.h_norm
+            return callback(self.h_norm)
+
+        order, self.orders_evaluated = find_minimum_order(matches, seed)
+        if errors:
+            return errors[0]
+        elif order is None:
+            self.h_norm = None
             return ApproximationErrorCode.MAXIMUM_ORDER_REACHED
+        else:
+            self.h_norm = designs[order]
+            self.denorm_order = order
+            return ApproximationErrorCode.OK
+
+    def _compute_design(self) -> ApproximationErrorCode:
+        """ Computes the normalised and denormalised transfer functions, using the fixed order
+        when given or a template based design otherwise. """
+        # Normalising the filter template, choosing design mode between fixed order or
+        # a template based design, trying to match the given parameters
+        wan, aa, wfn, gdn, tolerance = self._normalised_template()
+        if self.ord > 0:
+            try:
+                error_code = self.compute_normalised_by_order(gdn, wfn, self.ord)
+                self.denorm_order = self.ord
+            except NotImplementedError:
+                error_code = ApproximationErrorCode.UNDEFINED_APPROXIMATION
+        else:
+            error_code = self.compute_normalised_by_template(gdn, wfn, aa, wan, tolerance)
+
+        # Denormalisation process, using the order found for the normalised transfer function
+        if error_code is ApproximationErrorCode.OK:
+            error_code = self._denormalised_transfer_function()
+        return error_code
+
+    def _compute_by_selectivity(self) -> ApproximationErrorCode:
+        """ Computes the transfer function with the highest order whose poles do not exceed the
+        maximum selectivity. The maximum Q of the poles usually grows with the order, so the answer is searched
+        with find_maximum_order, and the amount of designs is stored in orders_evaluated. """
+        designs = {}
+
+        def exceeds(order):
+            self.ord = order
+            error_code = self._compute_design()
+            designs[order] = (error_code, self.h_norm, self.h_denorm, self.denorm_order)
+
+            # Errors stop the search, as lower orders are preferred
+            return error_code is not ApproximationErrorCode.OK or not self.matches_selectivity(self.q, self.h_denorm)
+
+        order, self.orders_evaluated = find_maximum_order(exceeds)
+        if order is None:
+            self.ord = 1
+            error_code = designs[1][0]
+            return ApproximationErrorCode.MAXIMUM_ORDER_REACHED if error_code is ApproximationErrorCode.OK else error_code
+
+        self.ord = order
+        error_code, self.h_norm, self.h_denorm, self.denorm_order = designs[order]
+        return error_code
 
     def _denormalised_transfer_function(self):
         raise NotImplementedError
@@ -705,20 +1059,16 @@ class GroupDelayFilterApproximator():
         if zpk is None:
             return False
 
-        w, mag, phase = ss.bode(zpk, w=[wa])
-        template_cond = mag[0] <= -aa
-        aux = zpk.to_tf()
-        w, h = ss.freqs(aux.num, aux.den)
-        gd = -np.diff(np.unwrap(np.angle(h))) / np.diff(w)
-        gd = np.divide(gd, gd[0])
-        index = 0
-        for i in gd:
-            if i < tolerance:
-                index = np.where(gd == i)
-                break
-        gd_cond = w[index] >= wf
-        return template_cond and gd_cond
+        template_cond = magnitude_response(zpk, [wa])[0] <= -aa
 
+        # Group delay relative to its value at DC, must not fall below the tolerance before wf
+        dc_group_delay = group_delay_response(zpk, [0])[0]
+        crossing = find_first_crossing(
+            lambda w: group_delay_response(zpk, w) / dc_group_delay,
+            tolerance, wf / 100, wf * 10
+        )
+        gd_cond = crossing is None or crossing >= wf
+        return template_cond and gd_cond
 
 
     @staticmethod
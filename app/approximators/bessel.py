@@ -18,8 +18,7 @@ class BesselApprox(GroupDelayFilterApproximator):
     # -------------------------#
 
     def compute_normalised_by_order(self, gdn, wfn, order) -> ApproximationErrorCode:
-        b, a = ss.bessel(order, gdn, analog=True,norm = 'delay')
-        self.h_norm = ss.TransferFunction(b,a).to_zpk()
+        self.h_norm = self.get_prototype(order, gdn, lambda: ss.bessel(order, gdn, analog=True, norm='delay', output='zpk'))
         return ApproximationErrorCode.OK
     # -----------------#
     # Private Methods #
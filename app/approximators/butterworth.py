@@ -23,19 +23,18 @@ class ButterworthApprox(AttFilterApproximator):
 
     def compute_normalised_by_order(self, ap, n, aa) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
-        # Computing needed constants 
-        epsilon = self.compute_epsilon(ap)
-        factor = 1 / np.float_power(epsilon, 1 / n)
+        def build_prototype():
+            # Computing needed constants
+            epsilon = self.compute_epsilon(ap)
+            factor = 1 / np.float_power(epsilon, 1 / n)
 
-        # Getting the Butterworth approximation for the given order
-        # and matching it with the given maximum attenuation for pass band
-        zeros, poles, gain = ss.buttap(n)
-        new_zeros = zeros
-        new_poles = [factor * pole for pole in poles]
-        new_gain = gain
+            # Getting the Butterworth approximation for the given order
+            # and matching it with the given maximum attenuation for pass band
+            zeros, poles, gain = ss.buttap(n)
+            return zeros, [factor * pole for pole in poles], gain
 
         # Updating the local transfer function, no errors!
-        self.h_aux = ss.ZerosPolesGain(new_zeros, new_poles, new_gain)
+        self.h_aux = self.get_prototype(n, ap, None, build_prototype)
         return ApproximationErrorCode.OK
 
     # ----------------- #
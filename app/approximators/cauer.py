@@ -24,11 +24,14 @@ class CauerApprox(AttFilterApproximator):
         if len(self.h_aux.poles) % 2 == 0:
             self.h_aux.gain = self.h_aux.gain / (10 ** (ap / 20))
 
+    def estimate_order(self, ap, aa, wpn, wan) -> int:
+        """ Returns the order estimated by the elliptic order selection of scipy.signal """
+        order, _ = ss.ellipord(wpn, wan, ap, aa, analog=True)
+        return int(order)
+
     def compute_normalised_by_order(self, ap, n, aa=None) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
-        # Computing needed constants
-        zeros, poles, gain = ss.ellipap(n, ap, aa)
-        self.h_aux = ss.ZerosPolesGain(zeros, poles, gain)
+        self.h_aux = self.get_prototype(n, ap, aa, lambda: ss.ellipap(n, ap, aa))
         return ApproximationErrorCode.OK
 
     def _validate_low_pass_by_fixed(self) -> ApproximationErrorCode:
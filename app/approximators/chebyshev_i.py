@@ -34,9 +34,7 @@ class ChebyshevIApprox(AttFilterApproximator):
 
     def compute_normalised_by_order(self, ap, n, aa) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
-        # Computing needed constants
-        zeros, poles, gain = ss.cheb1ap(n, ap)
-        self.h_aux = ss.ZerosPolesGain(zeros, poles, gain)
+        self.h_aux = self.get_prototype(n, ap, None, lambda: ss.cheb1ap(n, ap))
         return ApproximationErrorCode.OK
 
     # ----------------- #
@@ -3,9 +3,14 @@ import scipy.signal as ss
 import numpy as np
 from matplotlib import pyplot
 
+# Python native modules
+from functools import partial
+
 # filters-tool project modules
 from app.approximators.approximator import AttFilterApproximator
 from app.approximators.approximator import ApproximationErrorCode
+from app.approximators.approximator import find_first_crossing
+from app.approximators.approximator import magnitude_response
 
 
 class ChebyshevIIApprox(AttFilterApproximator):
@@ -48,22 +53,19 @@ class ChebyshevIIApprox(AttFilterApproximator):
 
     def compute_normalised_by_order(self, ap, n, aa) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
-        # Computing needed constants
-        zeros, poles, gain = ss.cheb2ap(n, aa)
-        wa, aa, wp, ap = self.get_norm_template()
-        self.h_aux = ss.ZerosPolesGain(zeros, poles, gain)
+        self.h_aux = self.get_prototype(n, None, aa, lambda: ss.cheb2ap(n, aa))
         return ApproximationErrorCode.OK
 
     def denormalisation_factor(self, wa, aa, wp, ap):
         """ Returns the denormalisation factor to be used when
         adjusting the zeros and poles of the transfer function between the transition
         band. """
+        relative_adjust = 1
         if self.q == 0 and self.ord == 0:
-            w_values, mag_values, _ = ss.bode(self.h_aux, w=np.linspace(wp / 100, wa * 10, num=10000))
-            pass_band = [w for w, mag in zip(w_values, mag_values) if mag >= (-ap)]
-            relative_adjust = ((wp - pass_band[-1]) / pass_band[-1]) * ((100 - self.denorm) / 100) + 1
-        else:
-            relative_adjust = 1
+            # The pass band is monotonic, so it ends where the magnitude first falls below -ap
+            pass_band = find_first_crossing(partial(magnitude_response, self.h_aux), -ap, wp / 100, wa * 10)
+            if pass_band is not None:
+                relative_adjust = ((wp - pass_band) / pass_band) * ((100 - self.denorm) / 100) + 1
 
         return relative_adjust
 
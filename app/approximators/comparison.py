@@ -0,0 +1,111 @@
+"""
+    Comparison of every approximation applicable to the same template, computing them in parallel
+    and ranking the results so the most convenient approximation can be picked with a single call.
+"""
+
+# Third-party modules
+import numpy as np
+
+# Python native modules
+from concurrent.futures import ProcessPoolExecutor
+
+# filters-tool project modules
+from app.approximators.approximator import ApproximationErrorCode
+from app.approximators.approximator import magnitude_response
+from app.approximators.approximator import group_delay_response
+from app.approximators.butterworth import ButterworthApprox
+from app.approximators.chebyshev_i import ChebyshevIApprox
+from app.approximators.chebyshev_ii import ChebyshevIIApprox
+from app.approximators.legendre import LegendreApprox
+from app.approximators.bessel import BesselApprox
+from app.approximators.gauss import GaussApprox
+from app.approximators.cauer import CauerApprox
+
+# Approximations applicable to attenuation templates and to group delay templates
+ATTENUATION_APPROXIMATIONS = {
+    'Butterworth': ButterworthApprox,
+    'Chebyshev I': ChebyshevIApprox,
+    'Chebyshev II': ChebyshevIIApprox,
+    'Legendre': LegendreApprox,
+    'Cauer': CauerApprox
+}
+GROUP_DELAY_APPROXIMATIONS = {
+    'Bessel': BesselApprox,
+    'Gauss': GaussApprox
+}
+
+# Amount of frequencies used to measure the pass band of the normalised transfer function
+PASS_BAND_SAMPLES = 512
+
+
+# ------------------ #
+#  Public Functions  #
+# ------------------ #
+
+def get_applicable_approximations(template: dict) -> dict:
+    """ Returns the approximations that can be used to design the given template. """
+    if template.get('type') == 'group-delay':
+        return GROUP_DELAY_APPROXIMATIONS
+    return ATTENUATION_APPROXIMATIONS
+
+
+def compare_approximations(template: dict, max_workers=None, parallel=True) -> list:
+    """ Computes every applicable approximation for the template, given as a dictionary
+    using the parameter names of the approximators, running each one in its own process.
+    Rows are ranked with the successful designs first, by order, stages, max Q and pass band ripple.
+    Returns -> [{'approximation', 'error_code', 'order', 'max_q', 'stages', 'ripple', 'flatness', 'zpk'}, ...]
+    """
+    names = list(get_applicable_approximations(template).keys())
+    if parallel:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            rows = list(executor.map(compute_approximation, names, [template] * len(names)))
+    else:
+        rows = [compute_approximation(name, template) for name in names]
+    return sorted(rows, key=rank_approximation)
+
+
+def compute_approximation(name: str, template: dict) -> dict:
+    """ Computes the approximation for the given template and measures its figures of merit,
+    the ripple in dB and the flatness as the percentage of maximum group delay variation,
+    both measured over the pass band of the normalised transfer function.
+    Returns -> {'approximation', 'error_code', 'order', 'max_q', 'stages', 'ripple', 'flatness', 'zpk'}
+    """
+    approximator = get_applicable_approximations(template)[name]()
+    approximator.set_parameters(template)
+    error_code = approximator.compute()
+
+    row = {
+        'approximation': name,
+        'error_code': error_code,
+        'order': None,
+        'max_q': None,
+        'stages': None,
+        'ripple': None,
+        'flatness': None,
+        'zpk': None
+    }
+    if error_code is ApproximationErrorCode.OK:
+        # Pass band of the normalised transfer function, where the ripple and flatness are measured
+        w = np.linspace(0, approximator.get_norm_pass_band_edge(), PASS_BAND_SAMPLES)
+
+        # Order of the normalised transfer function, as band-pass and band-stop double the denormalised one
+        order = len(approximator.h_norm.poles)
+        magnitude = magnitude_response(approximator.h_norm, w)
+        group_delay = group_delay_response(approximator.h_norm, w)
+        poles = approximator.h_denorm.poles
+        row.update(
+            order=order,
+            max_q=max([approximator.calculate_selectivity(pole) for pole in poles], default=0),
+            stages=int(np.ceil(len(poles) / 2)),
+            ripple=np.max(magnitude) - np.min(magnitude),
+            flatness=100 * np.max(np.abs(group_delay - group_delay[0])) / group_delay[0],
+            zpk=approximator.h_denorm
+        )
+    return row
+
+
+def rank_approximation(row: dict) -> tuple:
+    """ Returns the key used to rank the rows of the comparison, lower is better. """
+    if row['error_code'] is not ApproximationErrorCode.OK:
+        return 1, 0, 0, 0, 0
+    return 0, row['order'], row['stages'], row['max_q'], row['ripple']
@@ -1,12 +1,15 @@
 # Third-party modules
-from scipy import signal
-from scipy import special
-
+from numpy.polynomial import legendre
 from numpy import *
 
+# Python native modules
+from fractions import Fraction
+from functools import lru_cache
+
 # filters-tool project modules
 from app.approximators.approximator import AttFilterApproximator
 from app.approximators.approximator import ApproximationErrorCode
+from app.approximators.chebyshev_i import ChebyshevIApprox
 
 # Constant values
 CONSIDERED_ZERO_LIMIT = 1e-10
@@ -21,34 +24,43 @@ class LegendreApprox(AttFilterApproximator):
     #  Internal Public Methods  #
     # ------------------------- #
 
+    def estimate_order(self, ap, aa, wpn, wan) -> int:
+        """ Returns the order of Chebyshev I for the template, which is a lower bound of
+        the order needed by Legendre, having a monotonic pass band. """
+        return ChebyshevIApprox.compute_order(ap, aa, wan)
+
     def compute_normalised_by_order(self, ap, n, aa) -> ApproximationErrorCode:
         """ Generates normalised transfer function prioritising the fixed order """
-        # Computing needed constants from Legendre Approximation
-        epsilon = LegendreApprox.compute_epsilon(ap) ** 2
-        ln = LegendreApprox.compute_odd_integrated_polynomial(n) if (n % 2) else LegendreApprox.compute_even_integrated_polynomial(n)
-        ln = epsilon * ln
-        den = polyadd(poly1d([1]), ln)
-
-        # Normalised transfer function
-        new_gain = 1
-        new_poles = []
-        for pole in 1j * den.roots:
-            if pole.real < 0:
-                new_pole = complex(
-                    pole.real if abs(pole.real) > CONSIDERED_ZERO_LIMIT else 0,
-                    pole.imag if abs(pole.imag) > CONSIDERED_ZERO_LIMIT else 0
-                )
-                new_gain /= abs(new_pole)
-                new_poles.append(new_pole)
-
-        # Updating state of transfer function
-        self.h_aux = signal.ZerosPolesGain([], new_poles, new_gain)
+        self.h_aux = self.get_prototype(n, ap, None, lambda: LegendreApprox.compute_prototype(ap, n))
         return ApproximationErrorCode.OK
 
     # ----------------- #
     #  Private Methods  #
     # ----------------- #
 
+    @staticmethod
+    def compute_prototype(ap, n) -> tuple:
+        """ Returns the zeros, poles and gain of the normalised Legendre approximation """
+        # Denominator 1 + eps^2 * Ln(u) in the basis of Legendre polynomials of u = 2w^2 - 1,
+        # its roots are found as eigenvalues of the scaled companion matrix, well conditioned for high orders
+        epsilon = LegendreApprox.compute_epsilon(ap) ** 2
+        den = epsilon * array([float(coefficient) for coefficient in compute_integrated_series(n)])
+        den[0] += 1
+        roots = legendre.legroots(den)
+
+        # Poles in the left half plane, using s^2 = -w^2 = -(u + 1) / 2, and unit gain at DC
+        new_gain = 1
+        new_poles = []
+        for pole in -sqrt(-(roots + 1) / 2 + 0j):
+            new_pole = complex(
+                pole.real if abs(pole.real) > CONSIDERED_ZERO_LIMIT else 0,
+                pole.imag if abs(pole.imag) > CONSIDERED_ZERO_LIMIT else 0
+            )
+            new_gain *= abs(new_pole)
+            new_poles.append(new_pole)
+
+        return [], new_poles, new_gain
+
     @staticmethod
     def compute_epsilon(ap):
         """ Returns the epsilon factor using Legendre approximation """
@@ -58,59 +70,123 @@ class LegendreApprox(AttFilterApproximator):
     def compute_even_integrated_polynomial(n):
         """ Returns the integrated series of Legendre polynomial till the given order when is  even."""
         if (n % 2) == 0:
-            # First, calculate the integration polynomial as a sum of legendre polynomials
-            k = n // 2 - 1
-            b0 = 1 / sqrt((k + 1) * (k + 2))
-            poly = poly1d([b0 if (k % 2) == 0 else 0])
-
-            for i in range(1, k + 1):
-                if ((k % 2) == 1 and (i % 2) == 0) or ((k % 2) == 0 and (i % 2) == 1):
-                    continue
-                bi = b0 * (2 * i + 1)
-                new_poly = bi * LegendreApprox.compute_polynomial(i)
-                poly = polyadd(poly, new_poly)
-
-            poly = polymul(poly, poly)
-            poly = polymul(poly, poly1d([1, 1]))
-
-            # Calculate the indefinite integration and upper/lower limits
-            poly = polyint(poly)
-            upper = poly1d([2, 0, -1])
-            lower = poly1d([-1])
-
-            # Using barrow and returning the result!
-            return polysub(polyval(poly, upper), polyval(poly, lower))
+            return LegendreApprox.compute_integrated_polynomial(n)
         return None
 
     @staticmethod
     def compute_odd_integrated_polynomial(n):
         """ Returns the integrated series of Legendre polynomial till the given order when is odd """
         if n % 2:
-            # First, calculate the integration polynomial as a sum of legendre polynomials
-            k = (n - 1) // 2
-            a0 = 1 / (sqrt(2) * (k + 1))
-            poly = poly1d([a0])
-
-            for i in range(1, k + 1):
-                ai = a0 * (2 * i + 1)
-                poli = LegendreApprox.compute_polynomial(i)
-                new_poly = ai * poli
-                poly = polyadd(poly, new_poly)
-
-            poly = polymul(poly, poly)
-
-            # Calculate the indefinite integration and upper/lower limits
-            poly = polyint(poly)
-            upper = poly1d([2, 0, -1])
-            lower = poly1d([-1])
-
-            # Using barrow and returning the result!
-            return polysub(polyval(poly, upper), polyval(poly, lower))
+            return LegendreApprox.compute_integrated_polynomial(n)
         return None
 
+    @staticmethod
+    def compute_integrated_polynomial(n):
+        """ Returns the integrated series of Legendre polynomial of the given order, as a polynomial of w """
+        coefficients = []
+        for coefficient in compute_integrated_coefficients(n):
+            coefficients += [float(coefficient), 0]
+        return poly1d(coefficients[:-1])
+
     @staticmethod
     def compute_polynomial(n):
         """ Returns the polynomial of n-th order from Legendre """
         if n > 0:
-            return special.legendre(n)
+            return poly1d([float(coefficient) for coefficient in reversed(compute_legendre_coefficients(n))])
         return None
+
+
+# ------------------ #
+#  Public Functions  #
+# ------------------ #
+
+@lru_cache(maxsize=None)
+def compute_legendre_coefficients(n) -> tuple:
+    """ Returns the exact coefficients of the n-th Legendre polynomial, from the lowest power,
+    using the recurrence (n + 1) Pn+1(u) = (2n + 1) u Pn(u) - n Pn-1(u) """
+    if n == 0:
+        return Fraction(1),
+    if n == 1:
+        return Fraction(0), Fraction(1)
+    previous = compute_legendre_coefficients(n - 2)
+    current = compute_legendre_coefficients(n - 1)
+    shifted = _polynomial_mul((Fraction(0), Fraction(2 * n - 1)), current)
+    return tuple(
+        (coefficient - (n - 1) * (previous[i] if i < len(previous) else 0)) / n
+        for i, coefficient in enumerate(shifted)
+    )
+
+
+@lru_cache(maxsize=None)
+def compute_integrated_primitive(n) -> tuple:
+    """ Returns the exact coefficients of the integrated series Ln of the optimum Legendre approximation
+    as a polynomial of u = 2w^2 - 1, from the lowest power, computed once for each order.
+    Ln(u) = integral of v(t)^2 (or (t + 1) v(t)^2 for even orders) from -1 to u. """
+    # Series of Legendre polynomials, the a0 (or b0) factor is applied squared as it is irrational
+    if n % 2:
+        k = (n - 1) // 2
+        scale = Fraction(1, 2 * (k + 1) ** 2)
+        indexes = range(0, k + 1)
+    else:
+        k = n // 2 - 1
+        scale = Fraction(1, (k + 1) * (k + 2))
+        indexes = range(k % 2, k + 1, 2)
+
+    series = (Fraction(0),)
+    for i in indexes:
+        series = _polynomial_add(series, _polynomial_mul((Fraction(2 * i + 1),), compute_legendre_coefficients(i)))
+    integrand = _polynomial_mul(series, series)
+    if (n % 2) == 0:
+        integrand = _polynomial_mul(integrand, (Fraction(1), Fraction(1)))
+
+    # Indefinite integration and using barrow with the lower limit u = -1
+    primitive = [Fraction(0)] + [scale * coefficient / (i + 1) for i, coefficient in enumerate(integrand)]
+    lower = Fraction(0)
+    for i, coefficient in enumerate(primitive):
+        lower += coefficient * (-1) ** i
+    primitive[0] -= lower
+    return tuple(primitive)
+
+
+@lru_cache(maxsize=None)
+def compute_integrated_series(n) -> tuple:
+    """ Returns the exact coefficients of the integrated series Ln in the basis of Legendre polynomials
+    of u = 2w^2 - 1, from the lowest order, using Horner's method with u Pk = ((k + 1) Pk+1 + k Pk-1) / (2k + 1) """
+    series = []
+    for coefficient in reversed(compute_integrated_primitive(n)):
+        shifted = [Fraction(0)] * (len(series) + 1)
+        for k, value in enumerate(series):
+            shifted[k + 1] += value * (k + 1) / (2 * k + 1)
+            if k:
+                shifted[k - 1] += value * k / (2 * k + 1)
+        shifted[0] += coefficient
+        series = shifted
+    return tuple(series)
+
+
+@lru_cache(maxsize=None)
+def compute_integrated_coefficients(n) -> tuple:
+    """ Returns the exact coefficients of the integrated series Ln as a polynomial of x = w^2,
+    from the highest power, computed once for each order. """
+    result = (Fraction(0),)
+    for coefficient in reversed(compute_integrated_primitive(n)):
+        result = _polynomial_add(_polynomial_mul(result, (Fraction(-1), Fraction(2))), (coefficient,))
+    return tuple(reversed(result[:n + 1]))
+
+
+def _polynomial_add(first, second) -> tuple:
+    """ Adds two polynomials given from the lowest power """
+    length = len(first) if len(first) > len(second) else len(second)
+    return tuple(
+        (first[i] if i < len(first) else 0) + (second[i] if i < len(second) else 0)
+        for i in range(length)
+    )
+
+
+def _polynomial_mul(first, second) -> tuple:
+    """ Multiplies two polynomials given from the lowest power """
+    result = [Fraction(0)] * (len(first) + len(second) - 1)
+    for i, a in enumerate(first):
+        for j, b in enumerate(second):
+            result[i + j] += a * b
+    return tuple(result)
@@ -0,0 +1,86 @@
+# Third-party modules
+import numpy as np
+
+# Python native modules
+from collections import OrderedDict
+from threading import Lock
+
+# Constant Values
+PROTOTYPE_CACHE_SIZE = 512
+
+
+class PrototypeCache:
+    """ Bounded cache of normalised prototypes, shared by all the approximators.
+    Prototypes are stored as (zeros, poles, gain) by a key describing them, usually
+    (approximation, order, ap, aa), and the least recently used one is evicted when full.
+    Can be safely used from different threads.
+    """
+    def __init__(self, maximum_size=PROTOTYPE_CACHE_SIZE):
+        self.maximum_size = maximum_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._prototypes = OrderedDict()
+        self._lock = Lock()
+
+    # -------------- #
+    # Public Methods #
+    # -------------- #
+    def get_prototype(self, key, builder) -> tuple:
+        """ Returns the prototype stored with the given key, or builds it with the
+        builder callback (returning zeros, poles and gain) and stores it when missing.
+        Copies are returned, so the prototype can be modified by the caller.
+        Returns -> (zeros, poles, gain)
+        """
+        with self._lock:
+            prototype = self._prototypes.get(key)
+            if prototype is not None:
+                self._prototypes.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        # Building outside the lock, other threads can keep using the cache meanwhile
+        if prototype is None:
+            zeros, poles, gain = builder()
+            prototype = (np.array(zeros), np.array(poles), gain)
+            with self._lock:
+                self._prototypes[key] = prototype
+                self._prototypes.move_to_end(key)
+                while len(self._prototypes) > self.maximum_size:
+                    self._prototypes.popitem(last=False)
+                    self.evictions += 1
+
+        zeros, poles, gain = prototype
+        return zeros.copy(), poles.copy(), gain
+
+    def get_statistics(self) -> dict:
+        """ Returns a dictionary with the hits, misses, evictions and size of the cache. """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._prototypes)
+            }
+
+    def resize(self, maximum_size: int):
+        """ Changes the maximum amount of prototypes, evicting the least recently used ones if needed. """
+        with self._lock:
+            self.maximum_size = maximum_size
+            while len(self._prototypes) > self.maximum_size:
+                self._prototypes.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ Removes every prototype and resets the counters. """
+        with self._lock:
+            self._prototypes.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+# Cache shared by every approximator
+PROTOTYPE_CACHE = PrototypeCache()
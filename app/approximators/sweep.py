@@ -0,0 +1,74 @@
+"""
+    Design space sweeps, computing an approximation over every combination of the ranges given
+    for the parameters of the template, to see how the order or the maximum Q change along them.
+"""
+
+# Third-party modules
+import numpy as np
+
+# Python native modules
+from concurrent.futures import ProcessPoolExecutor
+from os import cpu_count
+
+
+# ------------------ #
+#  Public Functions  #
+# ------------------ #
+
+def sweep_approximation(approximation, ranges: dict, template=None, parallel=False, max_workers=None) -> dict:
+    """ Computes the approximation, given as an AttFilterApproximator subclass, over the grid of every
+    combination of the ranges given, as a dictionary of sequences using the names of TEMPLATE_PARAMETERS
+    (fpl, fal, Apl, Aal, denorm, q...). The parameters not swept are taken from the template dictionary.
+    Points are computed in batches sharing the normalised designs, optionally split in a process pool.
+    Returns -> {'grid': {name: values}, 'order': orders, 'max_q': max_qs, 'error_code': error_codes}
+    with arrays of shape (len(range_1), len(range_2), ...) following the order of the ranges,
+    orders being 0 and maximum Q being NaN where the design failed.
+    """
+    names = list(ranges.keys())
+    grid = np.meshgrid(*[np.ravel(ranges[name]) for name in names], indexing='ij')
+    shape = grid[0].shape if grid else ()
+    size = int(np.prod(shape))
+
+    columns = {name: [value] * size for name, value in (template or {}).items()}
+    columns.update({name: values.ravel().tolist() for name, values in zip(names, grid)})
+
+    if parallel and size > 1:
+        workers = max_workers if max_workers is not None else cpu_count()
+        chunks = [
+            {name: values[indexes[0]:indexes[-1] + 1] for name, values in columns.items()}
+            for indexes in np.array_split(np.arange(size), min(workers, size))
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(sweep_batch, [approximation] * len(chunks), chunks))
+        orders, max_qs, error_codes = [np.concatenate(arrays) for arrays in zip(*results)]
+    else:
+        orders, max_qs, error_codes = sweep_batch(approximation, columns)
+
+    return {
+        'grid': dict(zip(names, grid)),
+        'order': orders.reshape(shape),
+        'max_q': max_qs.reshape(shape),
+        'error_code': error_codes.reshape(shape)
+    }
+
+
+def sweep_batch(approximation, columns: dict) -> tuple:
+    """ Computes the approximation for a batch of templates given as a dictionary of columns.
+    Returns -> (orders, max_qs, error_codes) as arrays
+    """
+    results = approximation().compute_batch(columns)
+    orders = np.array([order for zpk, order, error_code in results], dtype=int)
+    max_qs = np.array([maximum_selectivity(zpk) for zpk, order, error_code in results], dtype=float)
+    error_codes = np.empty(len(results), dtype=object)
+    error_codes[:] = [error_code for zpk, order, error_code in results]
+    return orders, max_qs, error_codes
+
+
+def maximum_selectivity(zpk) -> float:
+    """ Returns the maximum Q of the poles of the ZerosPolesGain object,
+    being Q = |p| / (2 |Re(p)|) for each pole, or NaN if there is no transfer function. """
+    if zpk is None or len(zpk.poles) == 0:
+        return np.nan
+    poles = np.asarray(zpk.poles, dtype=complex)
+    return np.max(np.abs(poles) / (2 * np.abs(poles.real)))
+
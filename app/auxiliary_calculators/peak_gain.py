@@ -0,0 +1,91 @@
+"""
+    Closed form peak gain of transfer functions of at most second order, as any low-pass, high-pass, band-pass,
+    notch, low-pass notch or high-pass notch cell, computed at once for arrays of them.
+"""
+
+# Third-party modules
+import numpy as np
+
+
+# ------------------ #
+#  Public Functions  #
+# ------------------ #
+
+def peak_gain(numerators, denominators) -> tuple:
+    """ Returns the peak magnitude, and the angular frequency where it is reached, of the transfer functions
+    given by the coefficients of s², s and 1 of their numerators and denominators, as arrays of shape (..., 3).
+    The squared magnitude is a ratio of quadratics in w², so its peak is at DC, at high frequencies (returned
+    as an infinite frequency) or at a root of the quadratic its derivative vanishes at, all of them evaluated.
+    Returns -> (peaks, frequencies)
+    """
+    k2, k1, k0 = np.moveaxis(np.asarray(numerators, dtype=float), -1, 0)
+    e2, e1, e0 = np.moveaxis(np.asarray(denominators, dtype=float), -1, 0)
+
+    # Squared magnitudes of the numerator and denominator as quadratics in x = w²
+    n2, n1, n0 = k2 ** 2, k1 ** 2 - 2 * k0 * k2, k0 ** 2
+    d2, d1, d0 = e2 ** 2, e1 ** 2 - 2 * e0 * e2, e0 ** 2
+
+    # Stationary points of N(x) / D(x), roots of N'D - ND', whose cubic terms cancel
+    a = n2 * d1 - n1 * d2
+    b = 2 * (n2 * d0 - n0 * d2)
+    c = n1 * d0 - n0 * d1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        discriminant = b ** 2 - 4 * a * c
+        q = -(b + np.copysign(np.sqrt(np.abs(discriminant)), b)) / 2
+        roots = np.stack([q / a, c / q])
+    roots = np.where((discriminant >= 0) & np.isfinite(roots) & (roots > 0), roots, 0)
+
+    # Candidates are DC, the stationary points, and high frequencies where the magnitude tends
+    # to the ratio of the leading coefficients
+    candidates = np.concatenate([np.zeros((1,) + np.shape(roots)[1:]), roots])
+    gains = _ratio(
+        n2 * candidates ** 2 + n1 * candidates + n0,
+        d2 * candidates ** 2 + d1 * candidates + d0
+    )
+    high_frequency = np.where(d2 != 0, _ratio(n2, d2), np.where(n2 != 0, np.inf, _ratio(n1, d1)))
+    gains = np.concatenate([gains, high_frequency[np.newaxis]])
+    frequencies = np.concatenate([np.sqrt(candidates), np.full((1,) + np.shape(high_frequency), np.inf)])
+
+    index = np.argmax(gains, axis=0)[np.newaxis]
+    peaks = np.take_along_axis(gains, index, axis=0)[0]
+    return np.sqrt(peaks), np.take_along_axis(frequencies, index, axis=0)[0]
+
+
+def roots_coefficients(roots):
+    """ Returns the coefficients of s², s and 1 of the real polynomial with the given roots, at most two """
+    coefficients = np.real(np.poly(np.asarray(roots, dtype=complex))) if len(roots) else np.ones(1)
+    return np.concatenate([np.zeros(3 - len(coefficients)), coefficients])
+
+
+def cell_coefficients(cell_type: str, wp, q, w0=None) -> tuple:
+    """ Returns the coefficients of the numerator and denominator of a second order cell, given its type
+    ('low-pass', 'high-pass', 'band-pass', 'notch', 'low-pass-notch' or 'high-pass-notch'), the frequency and Q
+    of its poles and the frequency of its zeros for notches.
+    Low-pass cells have unit gain at DC, high-pass cells at high frequencies and band-pass cells at wp.
+    Every notch has the numerator s² + w0², so unit gain at high frequencies and a gain of (w0 / wp)² at DC,
+    above one for low-pass notches and below one for high-pass notches.
+    Returns -> (numerators, denominators)
+    """
+    wp, q = np.asarray(wp, dtype=float), np.asarray(q, dtype=float)
+    w0 = wp if w0 is None else np.asarray(w0, dtype=float)
+    zero = np.zeros(np.broadcast(wp, q, w0).shape)
+    denominators = np.stack(np.broadcast_arrays(zero + 1, wp / q, wp ** 2), axis=-1)
+    numerators = {
+        'low-pass': (zero, zero, zero + wp ** 2),
+        'high-pass': (zero + 1, zero, zero),
+        'band-pass': (zero, zero + wp / q, zero),
+        'notch': (zero + 1, zero, zero + w0 ** 2),
+        'low-pass-notch': (zero + 1, zero, zero + w0 ** 2),
+        'high-pass-notch': (zero + 1, zero, zero + w0 ** 2)
+    }[cell_type]
+    return np.stack(numerators, axis=-1), denominators
+
+
+# ------------------- #
+#  Private Functions  #
+# ------------------- #
+
+def _ratio(numerator, denominator):
+    """ Returns the ratio, being infinite where the denominator is null """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator != 0, numerator / np.where(denominator != 0, denominator, 1), np.inf)
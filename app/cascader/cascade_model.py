@@ -0,0 +1,87 @@
+"""
+    Model of a cascade of stages holding the complex response of each stage on a shared frequency grid,
+    and the cumulative products of them, so the response of any stage alone or of the cascade up to it
+    can be read without computing any transfer function again.
+"""
+
+# Third-party modules
+import numpy as np
+import scipy.signal as ss
+
+# filters-tool project modules
+from app.cascader.cascader import stage_zeros_poles
+from app.cascader.cascader import reference_gain
+from app.cascader.cascader import frequency_grid
+from app.auxiliary_calculators.peak_gain import peak_gain
+from app.auxiliary_calculators.peak_gain import roots_coefficients
+
+
+class CascadeModel():
+    def __init__(self):
+        # Angular frequencies shared by every stage
+        self.w = np.array([])
+
+        # Contents of the stages, their responses with the reference gain at 0 dB and the cumulative products
+        # of those responses, one row per stage, and the gains of the stages in dB
+        self.keys = []
+        self.responses = np.empty((0, 0), dtype=complex)
+        self.products = np.empty((0, 0), dtype=complex)
+        self.gains = np.array([])
+
+
+    def set_stages(self, stages: list):
+        """ Loads the stages of the cascade, given as the data of the stages list, computing only the responses
+        of the stages whose poles or zeros changed, and the cumulative products from the first one changed.
+        Every response is computed again when the frequency grid, covering every pole and zero, changes.
+        Gains are only applied when reading the responses, so editing them computes nothing again. """
+        keys = [self.stage_key(stage) for stage in stages]
+        w = frequency_grid(stages) * 2 * np.pi if stages else np.array([])
+        if len(keys) != len(self.keys) or not np.array_equal(w, self.w):
+            self.keys = []
+            self.w = w
+            self.responses = np.empty((len(stages), len(self.w)), dtype=complex)
+            self.products = np.empty((len(stages), len(self.w)), dtype=complex)
+
+        changed = [i for i, key in enumerate(keys) if i >= len(self.keys) or self.keys[i] != key]
+        for i in changed:
+            self.responses[i] = self.normalised_response(stages[i], self.w)
+        if changed:
+            self.update_products(changed[0])
+
+        self.keys = keys
+        self.gains = np.array([stage['gain_data'] for stage in stages], dtype=float)
+
+
+    def update_products(self, start: int):
+        """ Updates the cumulative products of the responses from the given stage to the last one """
+        for i in range(start, len(self.responses)):
+            self.products[i] = self.responses[i] if i == 0 else self.products[i - 1] * self.responses[i]
+
+
+    def stage_response(self, index: int):
+        """ Returns the complex response of the stage with its gain, at the angular frequencies of the model """
+        return self.responses[index] * 10 ** (self.gains[index] / 20)
+
+
+    def cumulative_response(self, index: int):
+        """ Returns the complex response of the cascade from the first stage up to the given one with their gains,
+        at the angular frequencies of the model. """
+        return self.products[index] * 10 ** (np.sum(self.gains[:index + 1]) / 20)
+
+
+    @staticmethod
+    def stage_key(stage) -> tuple:
+        """ Returns a hashable key identifying the poles and zeros of the stage """
+        zeros, poles = stage_zeros_poles(stage)
+        return tuple(zeros), tuple(poles)
+
+
+    @staticmethod
+    def normalised_response(stage, w):
+        """ Returns the complex response of the stage at the angular frequencies w, with the poles and zeros
+        of the stage given in Hz and its reference gain at 0 dB. """
+        zeros, poles = stage_zeros_poles(stage)
+        zeros, poles = zeros * 2 * np.pi, poles * 2 * np.pi
+        w, response = ss.freqs_zpk(zeros, poles, 1, w)
+        peak = 20 * np.log10(peak_gain(roots_coefficients(zeros), roots_coefficients(poles))[0])
+        return response / 10 ** (reference_gain(zeros, poles, peak) / 20)
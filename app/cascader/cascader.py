@@ -2,15 +2,35 @@
 import math
 import numpy as np
 import scipy.signal as ss
+from scipy.optimize import linear_sum_assignment
 from itertools import combinations
+from time import perf_counter
+from random import Random
+
+# filters-tool project modules
+from app.approximators.approximator import magnitude_response
+from app.auxiliary_calculators.peak_gain import peak_gain
+from app.auxiliary_calculators.peak_gain import roots_coefficients
 
 Q_MAX_FOR_FIRST_STAGE = 1.5
 Q_MIN_FOR_LAST_STAGE = 1.5
 MIN_GAIN_PER_STAGE = 5
 GAIN_RESOLUTION = 1
+FREQUENCY_POINTS = 4096     # Frequencies used to find the peak gain of the cascade after each stage
+FREQUENCY_MARGIN = 100      # Margin of the frequencies used, around the poles and zeros of the stages
+SORT_TIME_BUDGET = 1        # Seconds searching the best order of the stages before keeping the best found
+PROGRESS_INTERVAL = 256     # Orders evaluated between progress reports while sorting the stages
+
+
+class CascadeCancelled(Exception):
+    """ Raised by the cascader when the cascade is cancelled while computing it """
+
 
 class AutomaticCascader():
-    def __init__(self):
+    def __init__(self, distance=None):
+        # Distance between the frequencies of a pole and a zero, used when pairing them
+        self.distance = linear_distance if distance is None else distance
+
         self.poles = []
         self.zeros = []
         self.total_gain = 0
@@ -19,12 +39,38 @@ class AutomaticCascader():
         self.stages = []
         self.best_way = []
 
+        # Responses of the stages and peaks of the cascades already computed, by their content
+        self.responses = {}
+        self.cumulative_gains = {}
+
+        # Frequencies covering every pole and zero of the filter, shared by any cascade of them, and the content,
+        # cumulative responses and peaks of the last cascade evaluated, reused when editing some of its stages
+        self.w = None
+        self.last_keys = []
+        self.last_cumulative = []
+        self.last_peaks = []
+
+        # Callback receiving the step being computed and the amount of candidates evaluated,
+        # and whether the cascade was cancelled from another thread
+        self.progress_callback = None
+        self.cancelled = False
+
 
     def set_zeros_poles_gain(self, z, p, g):
+        self.cancelled = False
+        self.responses.clear()
+        self.cumulative_gains.clear()
+        self.last_keys = []
+        self.last_cumulative = []
+        self.last_peaks = []
         self.poles = p
         self.zeros = z
         self.total_gain = g
 
+        roots = [root for pole in p for root in pole.get('poles', [])]
+        roots += [root for zero in z for root in zero.get('zeros', [])]
+        self.w = roots_grid(roots) if any(abs(root) > 0 for root in roots) else None
+
 
     def separate_in_stages(self):
         self.stages.clear()
@@ -38,7 +84,7 @@ class AutomaticCascader():
                 # Completing zeros list so that they are the same size
                 aux_f0_list = list(f0_list)
                 aux_f0_list.extend([None] * (len(fp_list) - len(f0_list)))
-                min_dist, best_combination = self.recursive_shortest_sum_of_distances(fp_list, aux_f0_list)
+                min_dist, best_combination = self.shortest_sum_of_distances(fp_list, aux_f0_list)
 
             elif len(fp_list) < len(f0_list):
                 # This will only happen when there are a lot of simple zeros in the origin, like in a high-pass
@@ -49,7 +95,9 @@ class AutomaticCascader():
                         best_combination.append([fp_list[i], [f0_list[2*i]]])
 
             else:
-                min_dist, best_combination = self.recursive_shortest_sum_of_distances(fp_list, f0_list)
+                min_dist, best_combination = self.shortest_sum_of_distances(fp_list, f0_list)
+
+            self.report_progress('pairings', len(fp_list) * max(len(fp_list), len(f0_list)))
 
             for pair in best_combination:
                 # Creating cell block
@@ -108,7 +156,15 @@ class AutomaticCascader():
                 self.stages.append(new_stage_data)
 
 
-    def sort_stages(self):
+    def sort_stages(self, time_budget=SORT_TIME_BUDGET):
+        """ Sorts the stages maximising the dynamic range of the cascade, starting from the order
+        given by the Q of the poles, and searching a better one during the time budget in seconds. """
+        self.sort_stages_by_q()
+        if len(self.stages) > 1:
+            self.stages = self.optimise_order(self.stages, time_budget)
+
+
+    def sort_stages_by_q(self):
         # Sorting by Q of the poles
         self.stages = quicksort(self.stages)
 
@@ -127,63 +183,171 @@ class AutomaticCascader():
                 break
 
 
-    def assign_gains(self):
-        # It will be considered that all stages have a minimum gain in dB of MIN_GAIN_PER_STAGE
-        # Then there is a total of:
-        gain_to_distribute = MIN_GAIN_PER_STAGE * len(self.stages) + self.total_gain
-        # To distribute in k stages
-        # Considering a resolution of the gain for each stage of GAIN_RESOLUTION
-        gain_to_distribute /= GAIN_RESOLUTION
-        # Finding all ways to sum gain_to_distribute with k integers
-        dynamic_ranges = []
-        ways = multichoose(len(self.stages), gain_to_distribute)
-
-        # Reducing ways so that it doesn't take too long to calculate
-        if len(ways) > 20:
-            ways = ways[math.floor(len(ways) / 2) - 10 : math.floor(len(ways) / 2) + 10]
-
-        for i in range(len(ways)):
-            ways[i] = [gain - MIN_GAIN_PER_STAGE for gain in ways[i]]
-            aux_stages = list(self.stages)
-            dynamic_ranges.append(self.calculate_total_dynamic_range(aux_stages, ways[i]))
-
-        best_way = ways[dynamic_ranges.index(max(dynamic_ranges))]
-
-        aux_stages = list(self.stages)
-        self.total_dynamic_range = self.calculate_total_dynamic_range(aux_stages, best_way)
-
-        for i in range(len(self.stages)):
-            self.stages[i]['gain_data'] = best_way[i]
+    def optimise_order(self, stages, time_budget=SORT_TIME_BUDGET) -> list:
+        """ Returns the stages in the order minimising the loss of dynamic range caused by the ordering,
+        which is the highest difference, after any stage, between the peak of the partial cascade and its gain
+        where the signal of the whole cascade is expected. Orders are searched with branch and bound,
+        starting from the given one, and pruned when they cannot improve the best order found or when
+        the same stages were already cascaded with a lower loss. When the time budget in seconds runs out,
+        the best order found is returned.
+        """
+        w = self.frequencies(stages)
+        responses = [self.stage_response(stage, w)[0] for stage in stages]
+        reference = np.argmax(np.sum(responses, axis=0))
+        count = len(stages)
+
+        # Loss of every set of stages already cascaded, the partial cascade does not depend on their order
+        losses = {}
+        lowest_losses = {}
+
+        def cascade_loss(mask, curve):
+            if mask not in losses:
+                losses[mask] = np.max(curve) - curve[reference]
+            return losses[mask]
+
+        # Starting with the given order as the best one
+        best_order = list(range(count))
+        best_loss = -np.inf
+        mask, curve = 0, np.zeros(len(w))
+        for i in best_order:
+            mask, curve = mask | (1 << i), curve + responses[i]
+            best_loss = max(best_loss, cascade_loss(mask, curve))
+
+        deadline = perf_counter() + time_budget
+        evaluated = 0
+
+        def search(mask, curve, order, loss):
+            nonlocal best_order, best_loss, evaluated
+            evaluated += 1
+            if evaluated % PROGRESS_INTERVAL == 0:
+                self.report_progress('orders', evaluated)
+
+            if len(order) == count:
+                best_order, best_loss = list(order), loss
+                return True
+            elif perf_counter() > deadline:
+                return False
+
+            for i in range(count):
+                if not mask & (1 << i):
+                    new_mask, new_curve = mask | (1 << i), curve + responses[i]
+                    new_loss = max(loss, cascade_loss(new_mask, new_curve))
+                    if new_loss < best_loss - 1e-9 and new_loss < lowest_losses.get(new_mask, np.inf):
+                        lowest_losses[new_mask] = new_loss
+                        order.append(i)
+                        finished = search(new_mask, new_curve, order, new_loss)
+                        order.pop()
+                        if not finished and perf_counter() > deadline:
+                            return False
+            return True
+
+        search(0, np.zeros(len(w)), [], -np.inf)
+        self.report_progress('orders', evaluated)
+        return [stages[i] for i in best_order]
+
+
+    def assign_gains(self, resolution=GAIN_RESOLUTION):
+        """ Distributes the total gain between the stages maximising the dynamic range of the cascade,
+        every stage having a gain of at least -MIN_GAIN_PER_STAGE dB, using steps of the given resolution in dB. """
+        if self.stages:
+            peaks, references = self.calculate_cumulative_gains(self.stages)
+            gains, self.total_dynamic_range = optimise_gains(
+                peaks, references, self.total_gain,
+                self.stages[-1]['v_min_data'], self.stages[-1]['v_max_data'], resolution
+            )
+            self.report_progress('gains', len(gain_limits(peaks, self.total_gain, resolution)))
+
+            for i in range(len(self.stages)):
+                self.stages[i]['gain_data'] = gains[i]
+
+
+    def cancel(self):
+        """ Cancels the cascade being computed, possibly from another thread,
+        raising CascadeCancelled in the next progress report. """
+        self.cancelled = True
+
+
+    def report_progress(self, step: str, evaluated: int):
+        """ Reports the amount of candidates evaluated in the step being computed to the progress callback,
+        raising CascadeCancelled if the cascade was cancelled. """
+        if self.cancelled:
+            raise CascadeCancelled
+        if self.progress_callback is not None:
+            self.progress_callback(step, evaluated)
 
 
     def calculate_total_dynamic_range(self, stages=None, gains=None, v_min=None, v_max=None):
+        """ Returns the dynamic range of the cascade of stages with the given gains in dB, by default the
+        stages of the cascader with their own gains, which also updates its total dynamic range. """
+        own_stages = stages is None
+        if own_stages:
+            stages = list(self.stages)
+        if not stages:
+            return 0
+        if gains is None:
+            gains = [stage['gain_data'] for stage in stages]
         if v_min is None or v_max is None:
             v_max = stages[-1]['v_max_data']
             v_min = stages[-1]['v_min_data']
 
-        if stages is None:
-            stages = list(self.stages)
-        if gains is None:
-            gains = [stage['gain_data'] for stage in self.stages]
+        peaks, references = self.calculate_cumulative_gains(stages)
+        dr = dynamic_range(np.cumsum(gains), peaks, references, v_min, v_max)
+        if own_stages:
+            self.total_dynamic_range = dr
+        return dr
 
-        rev_stages = list(stages)
-        # This way, the cells with higher Q are going to be looked at first
-        rev_stages.reverse()
-        total_max_gain = 1
-        for i in range(len(rev_stages)):
-            aux_stage = dict(rev_stages[i])
-            max_gain = self.max_gain_for_stage(aux_stage)
-            if max_gain > 1:
-                total_max_gain *= 1/max_gain
-            else:
-                total_max_gain *= max_gain
-            #aux_stage['gain_data'] = gains[-i-1]
-            #aux_stage['v_max_data'] = v_max
-            #aux_stage['v_min_data'] = v_min
-            #v_max, v_min = self.calculate_v_max_v_min(aux_stage, self.max_gain_for_stage(aux_stage))
 
-        dr = abs(20 * np.log10((v_max / v_min) * total_max_gain))
-        return dr
+    def calculate_cumulative_gains(self, stages):
+        """ Returns the peak gain in dB of the cascade after each stage, and its gain at the frequency
+        of the peak of the whole cascade, where the signal is expected, with every stage at 0 dB.
+        Results are cached by the content of the stages, so only the gains change between evaluations.
+        Returns -> (peaks, references)
+        """
+        w = self.frequencies(stages)
+        keys = [self.stage_key(stage, w) for stage in stages]
+        key = tuple(keys)
+        if key not in self.cumulative_gains:
+            # Reusing the cumulative responses and peaks of the last cascade evaluated up to its first stage changed,
+            # so editing a cascade only evaluates the stages from the first one touched
+            start = 0
+            while start < min(len(keys), len(self.last_keys)) and keys[start] == self.last_keys[start]:
+                start += 1
+
+            cumulative = self.last_cumulative[:start]
+            for stage in stages[start:]:
+                magnitude = self.stage_response(stage, w)[0]
+                cumulative.append(cumulative[-1] + magnitude if cumulative else magnitude)
+            peaks = np.append(self.last_peaks[:start], [np.max(row) for row in cumulative[start:]])
+
+            self.last_keys, self.last_cumulative, self.last_peaks = keys, cumulative, peaks
+            reference = np.argmax(cumulative[-1])
+            self.cumulative_gains[key] = (peaks, np.array([row[reference] for row in cumulative]))
+        return self.cumulative_gains[key]
+
+
+    def frequencies(self, stages):
+        """ Returns the angular frequencies used to evaluate the cascade of stages, those covering every pole
+        and zero of the filter when they were given, which stay the same while editing the cascade. """
+        return self.w if self.w is not None else frequency_grid(stages)
+
+
+    def stage_response(self, stage, w) -> tuple:
+        """ Returns the magnitude response in dB of the stage at the angular frequencies w, with its reference
+        gain at 0 dB, and its peak gain, computed once for each stage content and frequencies.
+        Returns -> (magnitude, peak)
+        """
+        key = self.stage_key(stage, w)
+        if key not in self.responses:
+            magnitude = stage_response(stage, w)
+            self.responses[key] = (magnitude, np.max(magnitude))
+        return self.responses[key]
+
+
+    @staticmethod
+    def stage_key(stage, w) -> tuple:
+        """ Returns a hashable key identifying the response of the stage at the angular frequencies w """
+        zeros, poles = stage_zeros_poles(stage)
+        return tuple(zeros), tuple(poles), w[0], w[-1], len(w)
 
 
     def calculate_v_max_v_min(self, stage, max_gain_in_db):
@@ -200,83 +364,26 @@ class AutomaticCascader():
         return v_max, v_min
 
 
-    def max_gain_for_stage(self, stage):
-        if stage['zero'] is None:
-            zeros = []
-        else:
-            zeros = stage['zero']['zeros']
-        poles = stage['pole']['poles']
-        gain = 10**(stage['gain_data']/20)
-        transfer_function = ss.ZerosPolesGain(zeros, poles, gain)
-        w, mag, phase = ss.bode(transfer_function, n=1000)
-
-        dmag = np.diff(mag)/np.diff(w)
-
-        frequencies_to_check = 10
-        zero_condition = 1.0e-4
-        gain_needed = 0
-        for i in range(len(dmag) - frequencies_to_check):
-            values_checked = []
-            for j in range(frequencies_to_check):
-                values_checked.append(dmag[i + j])
-            
-            if all([value < zero_condition for value in values_checked]):
-                frequency_to_evaluate = math.floor(i + frequencies_to_check/2)
-                max_freq = w[frequency_to_evaluate]
-                useless_1, gain_in_passband, useless_2 = ss.bode(transfer_function, [max_freq])
-                gain_in_passband = 10**(gain_in_passband[0]/20)
-                gain_needed = gain**2/gain_in_passband
-                break
-
-        transfer_function = ss.ZerosPolesGain(zeros, poles, gain_needed)
-        w, mag, phase = ss.bode(transfer_function)
-        return max(mag)
-
-
-    def recursive_shortest_sum_of_distances(self, poles : list, zeros : list) -> int:
-        combinations = {}
-
-        if len(poles) > 2:
-            for zero in zeros:
-                if zero is None or poles[0] is None:
-                    dist_from_pole_to_zero = np.inf
-                else:
-                    dist_from_pole_to_zero = abs(poles[0] - zero)
-                remaining_poles = list(poles)
-                remaining_poles.remove(remaining_poles[0])
-                remaining_zeros = list(zeros)
-                remaining_zeros.remove(zero)
-
-                min_distance, min_combination = self.recursive_shortest_sum_of_distances(remaining_poles, remaining_zeros)
-                new_distance = dist_from_pole_to_zero + min_distance
-                new_combinations = list(min_combination)
-                new_combinations.append([poles[0], [zero]])
-
-                combinations[new_distance] = new_combinations
-            
-        elif len(poles) == 2:
-            if zeros[0] is None:
-                dist_0_0 = dist_1_0 = np.inf
-            else:
-                dist_0_0 = abs(poles[0] - zeros[0])
-                dist_1_0 = abs(poles[1] - zeros[0])
-
-            if zeros[1] is None:
-                dist_0_1 = dist_1_1 = np.inf
-            else:
-                dist_0_1 = abs(poles[0] - zeros[1])
-                dist_1_1 = abs(poles[1] - zeros[1])
-
-                
-            combinations[dist_0_0 + dist_1_1] = [[poles[0], [zeros[0]]], [poles[1], [zeros[1]]]]
-            combinations[dist_0_1 + dist_1_0] = [[poles[0], [zeros[1]]], [poles[1], [zeros[0]]]]
-
-        else:
-            combinations[0] = [[poles[0], [zeros[0]]]]
+    def shortest_sum_of_distances(self, poles : list, zeros : list) -> tuple:
+        """ Pairs every pole frequency with a zero frequency, minimising the sum of their distances,
+        solved as an assignment problem. Missing zeros are given as None and add no distance.
+        Returns -> (min_distance, [[pole, [zero]], ...])
+        """
+        pole_frequencies = np.array([np.nan if pole is None else pole for pole in poles], dtype=float)
+        zero_frequencies = np.array([np.nan if zero is None else zero for zero in zeros], dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            distances = self.distance(pole_frequencies[:, np.newaxis], zero_frequencies[np.newaxis, :])
+        distances[np.isnan(distances)] = 0
 
-        min_distance = min(combinations.keys())
+        # Pairs too far to be measured (like zeros in the origin using decades) are only used
+        # when there is no other choice, costing more than any other pairing
+        unreachable = ~np.isfinite(distances)
+        costs = np.array(distances)
+        costs[unreachable] = (np.max(distances[~unreachable], initial=0) + 1) * len(poles)
 
-        return min_distance, combinations[min_distance]
+        rows, columns = linear_sum_assignment(costs)
+        min_distance = np.sum(distances[rows, columns])
+        return min_distance, [[poles[row], [zeros[column]]] for row, column in zip(rows, columns)]
 
 
     def what_am_i(self, stage_data):
@@ -309,13 +416,221 @@ class AutomaticCascader():
                         stage_data['type'] = 'high-pass'
 
 
-def multichoose(n,k):
-    if k < 0 or n < 0: return "Error"
-    if not k: return [[0]*n]
-    if not n: return []
-    if n == 1: return [[k]]
-    return [[0]+val for val in multichoose(n-1,k)] + \
-        [[val[0]+1]+val[1:] for val in multichoose(n,k-1)]
+def stage_zeros_poles(stage) -> tuple:
+    """ Returns the zeros and poles of the stage as arrays.
+    Returns -> (zeros, poles)
+    """
+    zeros = [] if stage['zero'] is None else stage['zero']['zeros']
+    return np.array(zeros, dtype=complex), np.array(stage['pole']['poles'], dtype=complex)
+
+
+def reference_gain(zeros, poles, peak) -> float:
+    """ Returns the gain in dB taken as the gain of a stage with unit gain factor, being its gain at DC when
+    it is neither null nor infinite, its gain at high frequencies if not, or its peak gain otherwise
+    (band-pass), given its peak gain in dB. """
+    if not np.any(np.isclose(zeros, 0)):
+        return 20 * np.log10(np.abs(np.prod(-zeros)) / np.abs(np.prod(-poles)))
+    elif len(zeros) == len(poles):
+        return 0
+    else:
+        return peak
+
+
+def stage_peak_gains(stages) -> tuple:
+    """ Returns the peak gain in dB of each stage with unit gain factor, and the angular frequency
+    where it is reached, computed in closed form for every stage at once.
+    Returns -> (peaks, frequencies)
+    """
+    roots = [stage_zeros_poles(stage) for stage in stages]
+    peaks, frequencies = peak_gain(
+        [roots_coefficients(zeros) for zeros, poles in roots],
+        [roots_coefficients(poles) for zeros, poles in roots]
+    )
+    return 20 * np.log10(peaks), frequencies
+
+
+def stage_response(stage, w):
+    """ Returns the magnitude response in dB of the stage at the angular frequencies w,
+    normalised to have its reference gain at 0 dB. """
+    zeros, poles = stage_zeros_poles(stage)
+    magnitude = magnitude_response(ss.ZerosPolesGain(zeros, poles, 1), w)
+    return magnitude - reference_gain(zeros, poles, stage_peak_gains([stage])[0][0])
+
+
+def frequency_grid(stages):
+    """ Returns the angular frequencies used to evaluate the response of the stages,
+    covering their poles and zeros with a margin of FREQUENCY_MARGIN. """
+    roots = []
+    for stage in stages:
+        zeros, poles = stage_zeros_poles(stage)
+        roots += list(np.append(zeros, poles))
+    return roots_grid(roots)
+
+
+def roots_grid(roots):
+    """ Returns the angular frequencies covering the given poles and zeros with a margin of FREQUENCY_MARGIN """
+    frequencies = [abs(root) for root in roots if abs(root) > 0]
+    return np.geomspace(min(frequencies) / FREQUENCY_MARGIN, max(frequencies) * FREQUENCY_MARGIN, FREQUENCY_POINTS)
+
+
+def dynamic_range(cumulative_gains, peaks, references, v_min, v_max) -> float:
+    """ Returns the dynamic range in dB of a cascade of stages, given the gain in dB accumulated after each stage
+    and the peak and reference gains of the cascade after each stage with every stage at 0 dB.
+    The input can grow until the highest peak reaches v_max, and decrease until the lowest signal,
+    at the reference frequency, falls to v_min.
+    """
+    cumulative_gains = np.asarray(cumulative_gains)
+    return 20 * np.log10(v_max / v_min) - np.max(cumulative_gains + peaks) + np.min(cumulative_gains + references)
+
+
+def gain_limits(peaks, total_gain, resolution=GAIN_RESOLUTION):
+    """ Returns the limits to the highest peak of the cascade tried when optimising the gains, from the
+    lowest possible one up to the one where the gains cannot be raised anymore. """
+    peaks = np.asarray(peaks, dtype=float)
+    highest = total_gain + MIN_GAIN_PER_STAGE * np.arange(len(peaks) - 1, -1, -1) + peaks
+    lowest = total_gain + peaks[-1]
+    return np.arange(lowest, max(np.max(highest), lowest) + resolution, resolution)
+
+
+def optimise_gains(peaks, references, total_gain, v_min, v_max, resolution=GAIN_RESOLUTION) -> tuple:
+    """ Returns the gains in dB of each stage, adding up to the total gain, which maximise the dynamic range,
+    with every gain being at least -MIN_GAIN_PER_STAGE and the accumulated gains multiples of the resolution.
+    For each limit to the highest peak of the cascade, the best gains are the highest ones allowed, found backwards
+    from the last stage, so every limit from the lowest possible one is tried and the best is kept.
+    Returns -> (gains, dynamic_range)
+    """
+    peaks, references = np.asarray(peaks, dtype=float), np.asarray(references, dtype=float)
+    n = len(peaks)
+
+    limits = gain_limits(peaks, total_gain, resolution)
+    cumulative = np.empty((n, len(limits)))
+    cumulative[-1] = total_gain
+    for k in range(n - 2, -1, -1):
+        highest = np.floor((limits - peaks[k]) / resolution + 1e-9) * resolution
+        cumulative[k] = np.minimum(highest, cumulative[k + 1] + MIN_GAIN_PER_STAGE)
+
+    dynamic_ranges = 20 * np.log10(v_max / v_min) \
+        - np.max(cumulative + peaks[:, np.newaxis], axis=0) \
+        + np.min(cumulative + references[:, np.newaxis], axis=0)
+    dynamic_ranges[cumulative[0] < -MIN_GAIN_PER_STAGE - 1e-9] = -np.inf
+    best = np.argmax(dynamic_ranges)
+
+    if np.isfinite(dynamic_ranges[best]):
+        best_cumulative = cumulative[:, best]
+    else:
+        # The total gain is too low for the minimum gain per stage, distributing it equally
+        best_cumulative = total_gain * np.arange(1, n + 1) / n
+    gains = np.diff(best_cumulative, prepend=0)
+    return [float(gain) for gain in gains], dynamic_range(best_cumulative, peaks, references, v_min, v_max)
+
+
+def linear_distance(fp, f0):
+    """ Returns the distance between the frequencies of poles and zeros """
+    return np.abs(fp - f0)
+
+
+def log_distance(fp, f0):
+    """ Returns the distance in decades between the frequencies of poles and zeros """
+    return np.abs(np.log10(fp) - np.log10(f0))
+
+
+def compositions(n, total, lower=0, upper=None, samples=None, seed=None):
+    """ Generates the ways of splitting the integer total between n stages, as lists of integers bounded by
+    lower and upper, given for every stage or for each of them, lazily and in lexicographic order, holding only
+    the current one in memory. With samples, that many of them are drawn uniformly instead, stratified by the
+    part of the first stage so every value it can take gets its share of samples.
+    """
+    lower = _stage_bounds(lower, n, 0)
+    upper = _stage_bounds(upper, n, total - sum(lower) + max(lower, default=0))
+    upper = [min(high, total - sum(lower) + low) for low, high in zip(lower, upper)]
+
+    # Lowest and highest sums of the parts from each stage to the last one
+    lowest = [sum(lower[i:]) for i in range(n + 1)]
+    highest = [sum(upper[i:]) for i in range(n + 1)]
+    if not lowest[0] <= total <= highest[0]:
+        return
+
+    def values(i, remaining):
+        return range(max(lower[i], remaining - highest[i + 1]), min(upper[i], remaining - lowest[i + 1]) + 1)
+
+    if samples is None:
+        # Total left before each stage, the parts of the following stages start from their lowest values
+        # and the last stage that can still be raised is raised by one
+        parts = [0] * n
+        remaining = [total] * (n + 1)
+
+        def fill(start):
+            for i in range(start, n):
+                parts[i] = values(i, remaining[i]).start
+                remaining[i + 1] = remaining[i] - parts[i]
+
+        fill(0)
+        while True:
+            yield list(parts)
+            i = n - 2
+            while i >= 0 and parts[i] == values(i, remaining[i]).stop - 1:
+                i -= 1
+            if i < 0:
+                return
+            parts[i] += 1
+            remaining[i + 1] -= 1
+            fill(i + 1)
+
+    # Counting the ways of splitting every remaining total between the last stages, to draw them uniformly,
+    # as sums over a window of the counts of the following stage
+    counts = [{lowest[n]: 1}]
+    for i in range(n - 1, -1, -1):
+        following = [counts[0].get(remaining, 0) for remaining in range(lowest[i + 1], highest[i + 1] + 1)]
+        cumulative = [0]
+        for count in following:
+            cumulative.append(cumulative[-1] + count)
+
+        def window(remaining):
+            start = min(max(remaining - upper[i] - lowest[i + 1], 0), len(following))
+            stop = min(max(remaining - lower[i] - lowest[i + 1] + 1, 0), len(following))
+            return cumulative[stop] - cumulative[start]
+
+        counts.insert(0, {remaining: window(remaining) for remaining in range(lowest[i], highest[i] + 1)})
+
+    random = Random(seed)
+    strata = [(value, counts[1][total - value]) for value in values(0, total)] if n else [(None, 1)]
+    for value, share in _stratify(samples, strata, counts[0][total]):
+        for _ in range(share):
+            parts = []
+            remaining = total
+            for i in range(n):
+                if i == 0:
+                    part = value
+                else:
+                    # Walking through the values of the stage weighted by the ways of splitting what is left
+                    choice = random.randrange(counts[i][remaining])
+                    for part in values(i, remaining):
+                        choice -= counts[i + 1][remaining - part]
+                        if choice < 0:
+                            break
+                parts.append(part)
+                remaining -= part
+            yield parts
+
+
+def _stage_bounds(bounds, n, default) -> list:
+    """ Returns the bounds of every stage, given for all of them or as a sequence """
+    if bounds is None:
+        return [default] * n
+    if np.ndim(bounds) == 0:
+        return [int(bounds)] * n
+    return [int(bound) for bound in bounds]
+
+
+def _stratify(samples, strata, count) -> list:
+    """ Splits the samples between the strata proportionally to their counts, by largest remainder.
+    Returns -> [(stratum, samples), ...]
+    """
+    shares = [samples * weight // count for stratum, weight in strata]
+    remainders = sorted(range(len(strata)), key=lambda i: samples * strata[i][1] % count, reverse=True)
+    for i in remainders[:samples - sum(shares)]:
+        shares[i] += 1
+    return [(stratum, share) for (stratum, weight), share in zip(strata, shares)]
 
 
 def quicksort(cells_array):
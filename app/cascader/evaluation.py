@@ -0,0 +1,116 @@
+"""
+    Evaluation of many alternative cascades of the same stages, as different pairings, orderings and gain
+    distributions, scoring them by dynamic range in a pool of processes and keeping only the best ones.
+"""
+
+# Python native modules
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures import FIRST_COMPLETED
+from itertools import islice
+from os import cpu_count
+import heapq
+
+# filters-tool project modules
+from app.cascader.cascader import AutomaticCascader
+from app.cascader.cascader import GAIN_RESOLUTION
+from app.cascader.cascader import frequency_grid
+from app.cascader.cascader import optimise_gains
+
+CASCADES_KEPT = 10              # Best cascades returned by default
+CASCADES_PER_TASK = 256         # Candidate cascades sent to a worker process at once
+TASKS_PER_WORKER = 2            # Tasks waiting for each worker, bounding the candidates held in memory
+
+# Stages shared by every candidate evaluated in the process, and the cascader caching their responses
+_stages = []
+_settings = {}
+_cascader = None
+
+
+# ------------------ #
+#  Public Functions  #
+# ------------------ #
+
+def evaluate_cascades(stages: list, candidates, total_gain, v_min=0.01, v_max=15, resolution=GAIN_RESOLUTION,
+                      top_k=CASCADES_KEPT, parallel=True, max_workers=None, chunk_size=CASCADES_PER_TASK) -> list:
+    """ Scores the candidate cascades by their dynamic range, with the gains distributed to maximise it,
+    and returns the best top_k of them. The stages, as the data of the stages list, are sent once to each worker
+    process and candidates refer to them by index, each candidate being the indexes of its stages in order,
+    so the same pool of stages can hold alternative pairings of poles and zeros. Candidates can be any iterable,
+    consumed in chunks while the workers evaluate them, and each chunk streams back only its best cascades.
+    Returns -> [{'dynamic_range', 'stages', 'gains'}, ...] sorted from the best cascade
+    """
+    settings = {'total_gain': total_gain, 'v_min': v_min, 'v_max': v_max, 'resolution': resolution}
+    candidates = iter(candidates)
+    chunks = iter(lambda: list(islice(candidates, chunk_size)), [])
+    best = []
+
+    if parallel:
+        workers = max_workers if max_workers is not None else cpu_count()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialise_worker,
+                                 initargs=(stages, settings)) as executor:
+            pending = set()
+            start = 0
+            for chunk in chunks:
+                pending.add(executor.submit(_evaluate_chunk, chunk, start, top_k))
+                start += len(chunk)
+                if len(pending) >= workers * TASKS_PER_WORKER:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    best = _merge_best(best, done, top_k)
+            best = _merge_best(best, wait(pending)[0], top_k)
+    else:
+        _initialise_worker(stages, settings)
+        start = 0
+        for chunk in chunks:
+            best = heapq.nlargest(top_k, best + _evaluate_chunk(chunk, start, top_k))
+            start += len(chunk)
+
+    return [
+        {'dynamic_range': dynamic_range, 'stages': list(indexes), 'gains': gains}
+        for dynamic_range, position, indexes, gains in sorted(best, reverse=True)
+    ]
+
+
+def score_cascade(cascader: AutomaticCascader, stages: list, settings: dict) -> tuple:
+    """ Returns the highest dynamic range of the cascade of stages and the gains in dB reaching it.
+    Returns -> (dynamic_range, gains)
+    """
+    peaks, references = cascader.calculate_cumulative_gains(stages)
+    gains, dynamic_range = optimise_gains(
+        peaks, references, settings['total_gain'], settings['v_min'], settings['v_max'], settings['resolution']
+    )
+    return dynamic_range, gains
+
+
+# ------------------- #
+#  Private Functions  #
+# ------------------- #
+
+def _initialise_worker(stages: list, settings: dict):
+    """ Keeps the stages and settings shared by every candidate evaluated in this process """
+    global _stages, _settings, _cascader
+    _stages, _settings = stages, settings
+    _cascader = AutomaticCascader()
+    _cascader.w = frequency_grid(stages)
+
+
+def _evaluate_chunk(candidates: list, start: int, top_k: int) -> list:
+    """ Scores a chunk of candidates, returning its best top_k as (dynamic_range, position, stages, gains),
+    the position breaking ties in favour of the first candidate given. """
+    best = []
+    for position, indexes in enumerate(candidates, start):
+        dynamic_range, gains = score_cascade(_cascader, [_stages[i] for i in indexes], _settings)
+        entry = (dynamic_range, -position, tuple(indexes), gains)
+        if len(best) < top_k:
+            heapq.heappush(best, entry)
+        elif entry > best[0]:
+            heapq.heapreplace(best, entry)
+
+    # Cascades already scored are not needed anymore, only the responses of the stages are kept
+    _cascader.cumulative_gains.clear()
+    return best
+
+
+def _merge_best(best: list, futures, top_k: int) -> list:
+    """ Merges the best cascades of the finished chunks into the best ones found so far """
+    return heapq.nlargest(top_k, best + [entry for future in futures for entry in future.result()])
@@ -5,7 +5,7 @@
 # Project modules
 from app.cells.electronics import compute_commercial_by_iteration
 from app.cells.electronics import build_expression_callback
-from app.cells.electronics import nexpand_component_list
+from app.cells.electronics import join_component_options
 from app.cells.electronics import ComponentType
 
 from app.cells.cell import CellErrorCodes
@@ -81,10 +81,11 @@ class CompensatedDerivator(Cell):
             )
 
             # Collecting results!
-            self.results = nexpand_component_list(self.results, r2_r1_options, "R2", "R1")
-            self.results = nexpand_component_list(self.results, r1_c1_options, "R1", "C1")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r2_r1_options, "R2", "R1"),
+                (r1_c1_options, "R1", "C1")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     def get_parameters(self) -> tuple:
         zeros = {"wz": 0, "nz": 1}
@@ -174,10 +175,11 @@ class CompensatedIntegrator(Cell):
             )
 
             # Cross selection of possible values of components [ (R1, R2), (R1, R2) ] [(R2, C1), (R2, C1)]
-            self.results = nexpand_component_list(self.results, r1_r2_options, "R1", "R2")
-            self.results = nexpand_component_list(self.results, r2_c1_options, "R2", "C1")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r1_r2_options, "R1", "R2"),
+                (r2_c1_options, "R2", "C1")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     def get_parameters(self) -> tuple:
         poles = {"wp": self.wp()}
@@ -1,9 +1,38 @@
 # Third-party modules
+import numpy as np
 
 # Python native modules
 from enum import Enum
-from random import *
-from time import *
+from functools import reduce
+
+# Project modules
+from app.cells.electronics import compile_expression
+from app.cells.electronics import ComponentTable
+from app.cells.electronics import ROWS_PER_CHUNK
+
+
+# Best results kept after designing a cell
+RESULTS_KEPT = 10
+
+# Practical values of resistors and capacitors, by the first letter of their labels
+PRACTICAL_RANGES = {
+    "R": (1e3, 1e6),
+    "C": (100e-12, 1e-6)
+}
+
+# Weights of the parts of the score of a result, lower scores being better designs:
+#   error: Largest relative error of the parameters (wz, wp, qp, k) against their targets
+#   range: Sum of the decades each component is out of its practical range
+#   sensitivity: Sum of the absolute sensitivities of the parameters to every component
+#   spread: Decades between the lowest and highest value of resistors, and of capacitors
+#   count: Number of different component values
+SCORE_WEIGHTS = {
+    "error": 100,
+    "range": 10,
+    "sensitivity": 1,
+    "spread": 1,
+    "count": 0.1
+}
 
 
 class CellErrorCodes(Enum):
@@ -55,6 +84,9 @@ class Cell:
         self.name = name
         self.error = 0.2
 
+        # Whether the components found by the last design meet every target within the error tolerance
+        self.within_tolerance = False
+
         # Additional internal options of any cell
         self.options = {
             "inverter": None,
@@ -102,6 +134,11 @@ class Cell:
         """ Returns the file path of the circuit's image for the given cell type. """
         return self.circuit
 
+    def is_within_tolerance(self) -> bool:
+        """ Returns whether the components found by the last design meet every target within the error tolerance,
+            being False when no set of components did, and the best one found was selected anyway. """
+        return self.within_tolerance
+
     # -------------- #
     # Public Methods #
     # -------------- #
@@ -149,24 +186,134 @@ class Cell:
     # Internal Methods #
     # ---------------- #
     def calculate_with_components(self, expression, **kwargs):
-        """ Returns the evaluation of the given expression using components """
+        """ Returns the evaluation of the given expression using components, compiled once for each expression,
+        which also accepts arrays of component values. """
         if type(expression) is int or type(expression) is float:
             return expression
         else:
-            return expression.evalf(subs={**self.components, **kwargs})
-
-    def flush_results(self):
-        """ Clean the non-complete results, when not all components are defined in every result """
-        targets = [result for result in self.results if len(result.keys()) < len(self.components.keys())]
-        for target in targets:
-            self.results.remove(target)
-
-    def choose_random_result(self):
-        """ Update the current selection of components using any of the possible results randomly. """
-        if self.results:
-            seed(time())
-            shuffle(self.results)
-            self.components = choice(self.results)
+            values = {**self.components, **kwargs}
+            names = tuple(sorted(values.keys()))
+            return compile_expression(expression, names)(*[values[name] for name in names])
+
+    def rank_results(self, groups: list, zeros: dict, poles: dict, gain: float, stop_at_first=False,
+                     top_k=RESULTS_KEPT):
+        """ Scores the sets of components of the tables of independent groups of components, keeping the best top_k
+            as results, sorted from the best, and selecting the best one as the components of the cell.
+            When stop_at_first, the search stops with the first set of components meeting every target within
+            the error tolerance of the cell. Sets of components not defining every component of the cell are ignored.
+            Whether the selected components meet every target within the error tolerance is kept in within_tolerance.
+        """
+        components = self.components
+        labels = {label for table in groups for label in table.labels()}
+        results = []
+        if components.keys() <= labels and all(len(table) for table in groups):
+            groups = [practical_order(table) for table in groups]
+            candidates = groups[0] if len(groups) == 1 else self.combine_groups(groups, zeros, poles, gain, top_k)
+            results = self.best_results(candidates, zeros, poles, gain, stop_at_first, top_k)
+
+        self.results = results
+        self.components = results[0] if results else components
+        self.within_tolerance = bool(results and self.parameters_error(zeros, poles, gain) <= self.error)
+
+    def combine_groups(self, groups: list, zeros: dict, poles: dict, gain: float, top_k=RESULTS_KEPT):
+        """ Returns the table combining the best sets of components of each independent group, instead of every
+            combination of them. Each group is ranked in turn, with the components of the other groups fixed
+            at the best ones found so far, and only its best top_k are combined.
+        """
+        kept = [table.take([0]) for table in groups]
+        for index, table in enumerate(groups):
+            columns = {}
+            for other in kept[:index] + kept[index + 1:]:
+                columns.update({label: np.repeat(values[:1], len(table)) for label, values in other.columns.items()})
+            columns.update(table.columns)
+            results = self.best_results(ComponentTable(columns), zeros, poles, gain, top_k=top_k)
+            kept[index] = ComponentTable.from_rows([{label: result[label] for label in table.labels()} for result in results])
+        return reduce(ComponentTable.join, kept)
+
+    def best_results(self, candidates, zeros: dict, poles: dict, gain: float, stop_at_first=False,
+                     top_k=RESULTS_KEPT) -> list:
+        """ Returns the best top_k of the table of candidate sets of components, sorted from the best, or only the
+            first one meeting every target within the error tolerance of the cell, with every component in its
+            practical range, when stop_at_first.
+            Candidates are scored a chunk of rows at a time with array operations, so stopping early does not score
+            the whole table, and only the kept rows are converted to dictionaries.
+        """
+        best_rows, best_scores = np.array([], dtype=int), np.array([])
+        for start in range(0, len(candidates), ROWS_PER_CHUNK):
+            rows = np.arange(start, min(start + ROWS_PER_CHUNK, len(candidates)))
+            self.components = candidates.take(rows).columns
+            error = np.broadcast_to(self.parameters_error(zeros, poles, gain), rows.shape)
+            if stop_at_first:
+                matches = np.flatnonzero((error <= self.error) & (out_of_practical_range(self.components) == 0))
+                if matches.size:
+                    return candidates.take(rows[matches[:1]]).rows()
+
+            # Ties keep the earlier rows, as the sort is stable and the kept rows come first
+            best_rows = np.concatenate((best_rows, rows))
+            best_scores = np.concatenate((best_scores, np.broadcast_to(self.score_components(error), rows.shape)))
+            order = np.argsort(best_scores, kind="stable")[:top_k]
+            best_rows, best_scores = best_rows[order], best_scores[order]
+        return candidates.take(best_rows).rows()
+
+    def parameters_error(self, zeros: dict, poles: dict, gain: float):
+        """ Returns the largest relative error of the parameters of the current components against the target
+            zeros, poles and gain, absolute errors being used for null targets. Components given as arrays of
+            values return an array of errors.
+        """
+        actual_zeros, actual_poles, actual_gain = self.get_parameters()
+        errors = [relative_error(actual_gain, gain)]
+        for targets, actual in ((zeros or {}, actual_zeros), (poles or {}, actual_poles)):
+            errors += [relative_error(actual[key], targets[key]) for key in ("wz", "wp", "qp") if key in targets and key in actual]
+        return np.maximum.reduce(np.broadcast_arrays(*errors))
+
+    def score_components(self, error):
+        """ Returns the score of the current components with the given error of their parameters, weighting it
+            with how far they are out of their practical ranges, their sensitivities, the spread of their values
+            and the number of different values. Components given as arrays of values return an array of scores.
+        """
+        sensitivities = self.get_sensitivities()
+        sensitivity = sum(abs(value) for parameter in sensitivities.values() for value in parameter.values())
+        spread = 0
+        for prefix in ("R", "C"):
+            values = [value for label, value in self.components.items() if label.startswith(prefix)]
+            if values:
+                spread = spread + np.log10(np.maximum.reduce(values) / np.minimum.reduce(values))
+        values = np.sort(np.stack(np.broadcast_arrays(*self.components.values()), axis=-1), axis=-1)
+        count = 1 + np.count_nonzero(np.diff(values, axis=-1), axis=-1)
+        return (
+            SCORE_WEIGHTS["error"] * error + SCORE_WEIGHTS["range"] * out_of_practical_range(self.components)
+            + SCORE_WEIGHTS["sensitivity"] * sensitivity + SCORE_WEIGHTS["spread"] * spread
+            + SCORE_WEIGHTS["count"] * count
+        )
+
+
+def relative_error(value: float, target: float) -> float:
+    """ Returns the relative error of the value against the target, or the absolute error for a null target """
+    return abs(value - target) / abs(target) if target else abs(value)
+
+
+def out_of_practical_range(components: dict):
+    """ Returns the sum of the decades each component is out of its practical range, for components given
+    as values or as arrays of values, being zero for components of any other kind. """
+    decades = 0
+    for label, values in components.items():
+        if label[0] in PRACTICAL_RANGES:
+            lowest, highest = PRACTICAL_RANGES[label[0]]
+            values = np.asarray(values, dtype=float)
+            decades = decades + np.maximum(np.log10(lowest / values), 0) + np.maximum(np.log10(values / highest), 0)
+    return decades
+
+
+def practical_order(table):
+    """ Returns the table sorted so the sets of components closer to their practical ranges come first,
+    and among those in range, the ones closer to the middle of the ranges in the logarithmic domain. """
+    distance = np.zeros(len(table))
+    for label, values in table.columns.items():
+        if label[0] in PRACTICAL_RANGES:
+            lowest, highest = PRACTICAL_RANGES[label[0]]
+            distance += np.abs(np.log10(values) - np.log10(lowest * highest) / 2)
+    outside = np.zeros(len(table)) + out_of_practical_range(table.columns)
+    return table.take(np.lexsort((distance, outside)))
 
 
 class CellGroup:
@@ -231,6 +378,11 @@ class CellGroup:
         self._verify_cell()
         return self.current_cell.components
 
+    def is_within_tolerance(self) -> bool:
+        """ Returns whether the components found by the last design meet every target within the error tolerance. """
+        self._verify_cell()
+        return self.current_cell.is_within_tolerance()
+
     # -------------- #
     # Public Methods #
     # -------------- #
@@ -22,18 +22,159 @@ class ComponentType(Enum):
 # --------------------------- #
 # Constant Values Declaration #
 # --------------------------- #
-COMMERCIAL_RESISTORS = [
-    1, 1.1, 1.2, 1.3, 1.5, 1.8, 2, 2.2, 2.4, 2.7, 3, 3.3, 3.6, 3.9, 4.3, 4.7, 5.1,
-    5.6, 6.2, 6.8, 7.5, 8.2, 9.1
-]
+E192_EXCEPTIONS = {9.19: 9.2}
+
+E_SERIES = {
+    "E12": [1, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2],
+    "E24": [
+        1, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2, 2.2, 2.4, 2.7, 3, 3.3, 3.6, 3.9, 4.3, 4.7, 5.1,
+        5.6, 6.2, 6.8, 7.5, 8.2, 9.1
+    ],
+    # Series of three significant digits follow 10^(i/n) rounded, except for the values IEC 60063 lists otherwise
+    "E48": [round(10 ** (i / 48), 2) for i in range(48)],
+    "E96": [round(10 ** (i / 96), 2) for i in range(96)],
+    "E192": [E192_EXCEPTIONS.get(value, value) for value in (round(10 ** (i / 192), 2) for i in range(192))]
+}
+
+# Series used for each component type, and the range of commercial values of each type
+COMMERCIAL_SERIES = {
+    ComponentType.Resistor: "E24",
+    ComponentType.Capacitor: "E12"
+}
+
+COMMERCIAL_RANGES = {
+    ComponentType.Resistor: (1, 10e6),
+    ComponentType.Capacitor: (1e-12, 100e-6)
+}
+
+# Buckets of commercial values in each decade of the indexes, and indexes built once for each type and series
+BUCKETS_PER_DECADE = 64
+COMMERCIAL_INDEXES = {}
+
+# Rows of a component table converted into dictionaries at once when iterating it
+ROWS_PER_CHUNK = 1024
+
+# Expressions solved and compiled into NumPy functions, by the equation solved and the symbols used
+SOLVED_EXPRESSIONS = {}
+COMPILED_EXPRESSIONS = {}
+
+
+# --------------- #
+# Component Table #
+# --------------- #
+class ComponentTable:
+    """ Table of candidate values of components, stored as an array of values for each component label,
+    where each row is a set of components. Tables are combined with joins on the labels they share. """
+    def __init__(self, columns: dict):
+        self.columns = {label: np.asarray(values, dtype=float) for label, values in columns.items()}
+
+    @classmethod
+    def from_options(cls, options: list, *labels):
+        """ Returns the table of the options given as n-tuples of component values with the given labels """
+        values = np.array(options, dtype=float).reshape(len(options), len(labels))
+        return cls({label: values[:, index] for index, label in enumerate(labels)})
+
+    @classmethod
+    def from_rows(cls, rows: list):
+        """ Returns the table of the rows given as dictionaries of components with the same labels """
+        return cls({label: [row[label] for row in rows] for label in (rows[0].keys() if rows else [])})
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def labels(self) -> list:
+        return list(self.columns.keys())
+
+    def rows(self) -> list:
+        """ Returns the rows of the table as dictionaries of components """
+        return list(self.iter_rows())
+
+    def iter_rows(self, chunk_size: int = ROWS_PER_CHUNK):
+        """ Yields the rows of the table as dictionaries of components, converting the values
+        of a chunk of rows at a time, so stopping early does not convert the whole table. """
+        labels = self.labels()
+        for start in range(0, len(self), chunk_size):
+            chunk = [self.columns[label][start:start + chunk_size].tolist() for label in labels]
+            for values in zip(*chunk):
+                yield dict(zip(labels, values))
+
+    def take(self, rows):
+        """ Returns the table with the given rows, in the given order """
+        return ComponentTable({label: values[rows] for label, values in self.columns.items()})
+
+    def join(self, other):
+        """ Returns the table with every pair of rows of both tables having the same values in the labels
+        they share, or every pair of rows when they share none. The rows of the smaller table are grouped
+        by their shared values in a hash index, and each row of the larger one looks up its group once,
+        so the join takes linear time on the sizes of the tables and of the result. """
+        shared = [label for label in self.labels() if label in other.columns]
+        if shared and not (len(self) and len(other)):
+            own_rows = other_rows = np.array([], dtype=int)
+        elif shared:
+            build, probe = (self, other) if len(self) <= len(other) else (other, self)
+            index = {}
+            groups = np.array(
+                [index.setdefault(key, len(index)) for key in zip(*[build.columns[label].tolist() for label in shared])],
+                dtype=int
+            )
+            matches = np.array(
+                [index.get(key, -1) for key in zip(*[probe.columns[label].tolist() for label in shared])],
+                dtype=int
+            )
+
+            # Rows of the build table sorted by group, and the first one and number of rows of each group
+            members = np.argsort(groups, kind="stable")
+            sizes = np.bincount(groups, minlength=len(index))
+            firsts = np.cumsum(sizes) - sizes
+
+            # Each probe row is repeated once for each member of its group, which are taken in order
+            counts = np.where(matches >= 0, sizes[matches], 0)
+            probed_rows = np.repeat(np.arange(len(probe)), counts)
+            offsets = np.arange(len(probed_rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+            built_rows = members[firsts[matches[probed_rows]] + offsets]
+            own_rows, other_rows = (built_rows, probed_rows) if build is self else (probed_rows, built_rows)
+        else:
+            own_rows = np.repeat(np.arange(len(self)), len(other))
+            other_rows = np.tile(np.arange(len(other)), len(self))
+
+        columns = {label: values[own_rows] for label, values in self.columns.items()}
+        columns.update({label: values[other_rows] for label, values in other.columns.items() if label not in columns})
+        return ComponentTable(columns)
 
-MULTIPLIER_RESISTORS = [1e2, 1e3, 1e4, 1e5]
 
-COMMERCIAL_CAPACITORS = [
-    1, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2
-]
-
-MULTIPLER_CAPACITORS = [1e-12, 10e-12, 100e-12, 1e-9, 10e-9, 100e-9, 1e-6]
+# ---------------- #
+# Commercial Index #
+# ---------------- #
+class CommercialIndex:
+    """ Sorted array of every commercial value of a series within a range, bucketed in the logarithmic domain
+    so the nearest commercial value to any value is found looking only at the values of its bucket. """
+    def __init__(self, series: list, lowest: float, highest: float):
+        exponents = range(math.floor(math.log10(lowest)), math.ceil(math.log10(highest)) + 1)
+        values = [float("{}e{}".format(nominal, exponent)) for exponent in exponents for nominal in series]
+        self.values = np.unique([value for value in values if lowest <= value <= highest])
+
+        # First value of each bucket, from the bucket of the lowest value to the one after the highest
+        self.first_bucket = math.floor(np.log10(self.values[0]) * BUCKETS_PER_DECADE)
+        buckets = np.floor(np.log10(self.values) * BUCKETS_PER_DECADE).astype(int) - self.first_bucket
+        self.starts = np.searchsorted(buckets, np.arange(buckets[-1] + 2))
+        self.bucket_size = int(np.max(np.diff(self.starts)))
+
+    def nearest(self, values):
+        """ Returns the indexes of the nearest commercial value to each of the values """
+        values = np.asarray(values, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            buckets = np.floor(np.log10(values) * BUCKETS_PER_DECADE) - self.first_bucket
+        buckets = np.clip(np.nan_to_num(buckets, nan=0), 0, len(self.starts) - 2).astype(int)
+
+        # Counting the values of the bucket below each value gives the first commercial value above it
+        above = self.starts[buckets]
+        for offset in range(self.bucket_size):
+            candidates = np.minimum(self.starts[buckets] + offset, len(self.values) - 1)
+            above = above + ((self.starts[buckets] + offset < self.starts[buckets + 1]) & (self.values[candidates] < values))
+        above = np.clip(above, 1, len(self.values) - 1)
+        below = above - 1
+        with np.errstate(invalid='ignore'):
+            return np.where(np.abs(self.values[above] - values) < np.abs(values - self.values[below]), above, below)
 
 
 # ---------------- #
@@ -42,41 +183,39 @@ MULTIPLER_CAPACITORS = [1e-12, 10e-12, 100e-12, 1e-9, 10e-9, 100e-9, 1e-6]
 def nexpand_component_list(current: list, new_options: list, *args):
     """ Expands a list of dictionaries describing a set of components, by matching the new options
         with already registered ones, and appending new component labels and values.
+        Every registered set of components is joined with every new option matching the components
+        they share, or with every new option when they share none.
         [Parameters]
             + current: List of components [ {...} ]
             + new_options: List of n-tuple [ (...) ]
             + args: List of labels
         """
+    new_table = ComponentTable.from_options(new_options, *args)
     if not current:
-        for new_option in new_options:
-            new_pack = {}
-            for index, component in enumerate(new_option):
-                new_pack[args[index]] = component
-            current.append(new_pack)
-    else:
-        for new_option in new_options:
-            for current_option in current:
-                contained = False
-                matches = True
-
-                for index, component in enumerate(new_option):
-                    if not contained and args[index] in current_option.keys():
-                        contained = True
-
-                    if contained and args[index] in current_option.keys():
-                        if current_option[args[index]] != component:
-                            matches = False
-                            break
-
-                if contained:
-                    if matches:
-                        for index, component in enumerate(new_option):
-                            if args[index] not in current_option.keys():
-                                current_option[args[index]] = component
-                else:
-                    for index, component in enumerate(new_option):
-                        current_option[args[index]] = component
-    return current
+        return new_table.rows()
+    return ComponentTable.from_rows(current).join(new_table).rows()
+
+
+def join_component_options(*options) -> list:
+    """ Returns the tables of every set of components built by joining the options of each group
+        of components on the labels they share. Options connected through their labels are joined
+        into the same table, and independent ones are kept in separate tables, so their sets of
+        components are combined later without building every combination of them.
+        [Parameters]
+            + options: Tuples of the options, as a list of n-tuples, followed by their n labels
+        """
+    pending = [ComponentTable.from_options(group[0], *group[1:]) for group in options]
+    tables = []
+    while pending:
+        # Each table joins the next pending option sharing any of its labels, until none does
+        table = pending.pop(0)
+        connected = [other for other in pending if set(other.labels()) & set(table.labels())]
+        while connected:
+            pending.remove(connected[0])
+            table = table.join(connected[0])
+            connected = [other for other in pending if set(other.labels()) & set(table.labels())]
+        tables.append(table)
+    return tables
 
 
 def expand_component_list(current: list, new_options: list, label_one: str, label_two: str):
@@ -108,82 +247,72 @@ def expand_component_list(current: list, new_options: list, label_one: str, labe
 def matches_commercial_values(component_type: ComponentType, component_value: float, error: float) -> tuple:
     """ Returns a tuple -> (bool, commercial_value). Verifying if it matches with some error with any
         of the commercial values of components. """
-    def logarithmic_interpolation(component_type: ComponentType, x: float) -> int:
-        """ Approximates the initial searching of values """
-        if component_type is ComponentType.Resistor:
-            return int(9.9584 * ln(x) - 0.85)
-        elif component_type is ComponentType.Capacitor:
-            return int(5.226 * ln(x) - 0.085)
-
-    def scale_element(element: float) -> tuple:
-        """ Scales the element to the non multiplied values.
-            Returns -> (multiplier, nominal)"""
-        exponent = round(np.log10(float(element)))
-        return 10 ** exponent, element / (10 ** exponent)
-
     # Prevent stupid errors
     if (component_type is not ComponentType.Resistor and component_type is not ComponentType.Capacitor) or component_value < 0:
         return False, None
 
-    # We scale the given value to the interval of nominal components given by [1, 9.1]
-    # then we calculate using an approximation to interpole the searching list
-    multiplier, nominal = scale_element(component_value)
-    initial_interpolation = logarithmic_interpolation(component_type, nominal)
+    matches, commercial = match_commercial_values(component_type, [component_value], error)
+    return (True, float(commercial[0])) if matches[0] else (False, None)
 
-    # Prevent overdimension of components
-    if multiplier < min(get_multiplier_by_type(component_type)) or multiplier > max(get_multiplier_by_type(component_type)):
-        return False, None
 
-    for commercial_value in get_commercial_by_type(component_type)[initial_interpolation:]:
-        if math.isclose(nominal, commercial_value, rel_tol=error):
-            return True, commercial_value * multiplier
-        elif commercial_value > nominal:
-            return False, None
+def match_commercial_values(component_type: ComponentType, component_values, error: float) -> tuple:
+    """ Returns a tuple -> (matches, commercial_values) of arrays, with the nearest commercial value
+        to each of the given values and whether it matches with the relative error given, as math.isclose does.
+        Values which are negative, null or not finite never match. """
+    component_values = np.asarray(component_values, dtype=float)
+    index = get_commercial_index(component_type)
+    commercial = index.values[index.nearest(component_values)]
+    with np.errstate(invalid='ignore'):
+        matches = np.abs(commercial - component_values) <= error * np.maximum(np.abs(commercial), np.abs(component_values))
+    matches &= np.isfinite(component_values) & (component_values > 0)
+    return matches, commercial
 
 
-def random_commercial(component_type: ComponentType) -> float:
-    """ Returns a random commercial value for the given ComponentType """
+def random_commercial(component_type: ComponentType, lowest: float = None, highest: float = None) -> float:
+    """ Returns a random commercial value for the given ComponentType, from its current series and range,
+    optionally between the lowest and highest values given. """
     seed(time())
-    multiplier = choice(get_multiplier_by_type(component_type))
-    nominal = choice(get_commercial_by_type(component_type))
-    return nominal * multiplier
+    values = get_commercial_array(component_type)
+    if lowest is not None:
+        values = values[values >= lowest]
+    if highest is not None:
+        values = values[values <= highest]
+    return float(choice(values))
+
+
+def set_commercial_series(component_type: ComponentType, series: str):
+    """ Sets the series of commercial values used for the component type, one of E_SERIES. """
+    if series not in E_SERIES:
+        raise ValueError("Unknown series of commercial values {}".format(series))
+    COMMERCIAL_SERIES[component_type] = series
 
 
 def get_commercial_by_type(component_type: ComponentType) -> list:
     """ Returns the list of commercial unity values of the component by its type. """
-    if component_type is ComponentType.Resistor:
-        return COMMERCIAL_RESISTORS
-    elif component_type is ComponentType.Capacitor:
-        return COMMERCIAL_CAPACITORS
+    if component_type in COMMERCIAL_SERIES:
+        return E_SERIES[COMMERCIAL_SERIES[component_type]]
     else:
         return None
 
 
-def get_multiplier_by_type(component_type: ComponentType) -> list:
-    """ Returns the list of multiplier values of the component by its type. """
-    if component_type is ComponentType.Resistor:
-        return MULTIPLIER_RESISTORS
-    elif component_type is ComponentType.Capacitor:
-        return MULTIPLER_CAPACITORS
-    else:
-        return None
+def get_commercial_index(component_type: ComponentType) -> CommercialIndex:
+    """ Returns the index of commercial values of the component by its type, using its current series. """
+    key = (component_type, COMMERCIAL_SERIES[component_type])
+    if key not in COMMERCIAL_INDEXES:
+        COMMERCIAL_INDEXES[key] = CommercialIndex(get_commercial_by_type(component_type), *COMMERCIAL_RANGES[component_type])
+    return COMMERCIAL_INDEXES[key]
+
+
+def get_commercial_array(component_type: ComponentType):
+    """ Returns the sorted array of every commercial value of the component by its type. """
+    return get_commercial_index(component_type).values
 
 
 def compute_commercial_values(component_type: ComponentType) -> list:
     """ Returns a list of possible commercial values for the given component type.
     Returns None if non-identified component type. """
-
-    def multiply_lists(first_list, second_list) -> list:
-        new_list = []
-        for first_element in first_list:
-            for second_element in second_list:
-                new_list.append(first_element * second_element)
-        return new_list
-
-    if component_type is ComponentType.Resistor:
-        return multiply_lists(MULTIPLIER_RESISTORS, COMMERCIAL_RESISTORS)
-    elif component_type is ComponentType.Capacitor:
-        return multiply_lists(MULTIPLER_CAPACITORS, COMMERCIAL_CAPACITORS)
+    if component_type in COMMERCIAL_SERIES:
+        return get_commercial_array(component_type).tolist()
     else:
         return None
 
@@ -211,20 +340,38 @@ def compute_commercial_by_iteration(
     that verify the expression element_one = callback(element_two), with a relative decimal expressed error.
     Fixed list of values can be used to process the iteration.
     """
-    # Loading possible choices for each element, setting up the result list
-    element_two_values = compute_commercial_values(element_two) if fixed_two_values is None else fixed_two_values
-    results = []
+    # Loading possible choices for each element
+    if fixed_two_values is None:
+        element_two_values = get_commercial_array(element_two)
+    else:
+        element_two_values = np.asarray(fixed_two_values, dtype=float)
 
-    # Find for each possible element_two value, a resulting element_one and verify
+    # Find for every possible element_two value at once, a resulting element_one and verify
     # if matches with a commercial value with the given error tolerance
-    for element_two_value in element_two_values:
-        element_one_target = callback(element_two_value)
-        matches, commercial = matches_commercial_values(element_one, element_one_target, error)
-        if matches:
-            results.append((commercial, element_two_value))
+    element_one_targets = evaluate_callback(callback, element_two_values)
+    matches, commercial = match_commercial_values(element_one, element_one_targets, error)
 
     # Returning the results... empty or not
-    return results
+    return list(zip(commercial[matches].tolist(), element_two_values[matches].tolist()))
+
+
+def evaluate_callback(callback: callable, values):
+    """ Returns the array of results of the callback for every value, calling it once with the whole array,
+    or for each value when the callback only works with scalars. Results which are not real are NaN. """
+    try:
+        with np.errstate(all='ignore'):
+            results = np.asarray(callback(values), dtype=float)
+        return np.broadcast_to(results, values.shape)
+    except (TypeError, ValueError, AttributeError):
+        return np.array([_real_or_nan(callback(value)) for value in values.tolist()], dtype=float)
+
+
+def _real_or_nan(value) -> float:
+    """ Returns the value as a float, or NaN if it is not a real number """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
 
 
 # ----------------------- #
@@ -232,17 +379,29 @@ def compute_commercial_by_iteration(
 # ----------------------- #
 def build_expression_callback(expression, target, symbol):
     """ Returns a callback to get the element_one as function of element_two,
-    by solving an equation for the expression = target, getting the given symbol. """
-    solutions = solve(Eq(expression, target), symbol)
-    symbol_expression = solutions[0]
+    by solving an equation for the expression = target, getting the given symbol.
+    The solution is solved and compiled once, and the callback accepts whole arrays of element_two values. """
+    key = (sympify(expression), sympify(target), symbol)
+    if key not in SOLVED_EXPRESSIONS:
+        symbol_expression = solve(Eq(expression, target), symbol)[0]
+        names = tuple(str(free_symbol) for free_symbol in symbol_expression.free_symbols)
+        SOLVED_EXPRESSIONS[key] = compile_expression(symbol_expression, names), len(names)
+    compiled_expression, count = SOLVED_EXPRESSIONS[key]
 
     def callback(element_two_value: float):
-        symbol = symbol_expression.free_symbols.pop()
-        symbol_expression.free_symbols.add(symbol)
-        return symbol_expression.evalf(subs={symbol: element_two_value})
+        return compiled_expression(*[element_two_value] * count)
     return callback
 
 
+def compile_expression(expression, names: tuple) -> callable:
+    """ Returns a NumPy function evaluating the expression, taking as arguments the values of the symbols
+    with the given names in the same order, compiled once with lambdify for each expression and names. """
+    key = (expression, names)
+    if key not in COMPILED_EXPRESSIONS:
+        COMPILED_EXPRESSIONS[key] = lambdify([Symbol(name) for name in names], expression, "numpy")
+    return COMPILED_EXPRESSIONS[key]
+
+
 def build_proportional_callback(k: float):
     """ Returns a callback which operates as element_one = element_two * k """
     def callback(element_two_value: float):
@@ -1,12 +1,10 @@
 # Third-party modules
-
-# Python native modules
-from math import *
+from numpy import sqrt
 
 # Project modules
 from app.cells.electronics import compute_commercial_by_iteration
 from app.cells.electronics import matches_commercial_values
-from app.cells.electronics import nexpand_component_list
+from app.cells.electronics import join_component_options
 from app.cells.electronics import random_commercial
 from app.cells.electronics import ComponentType
 
@@ -15,6 +13,7 @@ from app.cells.cell import CellGroup
 from app.cells.cell import CellError
 from app.cells.cell import CellType
 from app.cells.cell import Cell
+from app.cells.cell import PRACTICAL_RANGES
 
 
 # --------------------- #
@@ -175,13 +174,14 @@ class FleischerTowBandStop(Cell):
                 )
                 r7_r8_r6_c1_r3 += [(r7, r7, r6, c1, r3) for r6, r7 in r6_r7]
 
-            self.results = nexpand_component_list(self.results, r2_r3_r5, "R2", "R3", "R5")
-            self.results = nexpand_component_list(self.results, r1_r2, "R1", "R2")
-            self.results = nexpand_component_list(self.results, c1_c2_r3, "C1", "C2", "R3")
-            self.results = nexpand_component_list(self.results, r1_r4_c1_r3, "R1", "R4", "C1", "R3")
-            self.results = nexpand_component_list(self.results, r7_r8_r6_c1_r3, "R7", "R8", "R6", "C1", "R3")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r2_r3_r5, "R2", "R3", "R5"),
+                (r1_r2, "R1", "R2"),
+                (c1_c2_r3, "C1", "C2", "R3"),
+                (r1_r4_c1_r3, "R1", "R4", "C1", "R3"),
+                (r7_r8_r6_c1_r3, "R7", "R8", "R6", "C1", "R3")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # --------------- #
     # Private Methods #
@@ -300,7 +300,7 @@ class FleischerTowBandPass(Cell):
             self.results = []
 
             # Random values... why not?
-            r7 = r8 = random_commercial(ComponentType.Resistor)
+            r7 = r8 = random_commercial(ComponentType.Resistor, *PRACTICAL_RANGES["R"])
 
             # Calculate R1 and R4 to verify the gain of the filter
             r1_r4 = compute_commercial_by_iteration(
@@ -327,12 +327,13 @@ class FleischerTowBandPass(Cell):
             )
             c1_c2_r2 = [(c, c, r) for c, r in c_r]
 
-            self.results = nexpand_component_list(self.results, c1_c2_r2, "C1", "C2", "R2")
-            self.results = nexpand_component_list(self.results, r1_r2_r3, "R1", "R2", "R3")
-            self.results = nexpand_component_list(self.results, r1_r4, "R1", "R4")
-            self.results = nexpand_component_list(self.results, [(r7, r8)], "R7", "R8")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (c1_c2_r2, "C1", "C2", "R2"),
+                (r1_r2_r3, "R1", "R2", "R3"),
+                (r1_r4, "R1", "R4"),
+                ([(r7, r8)], "R7", "R8")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # --------------- #
     # Private Methods #
@@ -476,12 +477,13 @@ class FleischerTowHighPass(Cell):
                 fixed_two_values=[r1 for r1, r2 in r1_r2]
             )
 
-            self.results = nexpand_component_list(self.results, r4_r1, "R4", "R1")
-            self.results = nexpand_component_list(self.results, r1_r2, "R1", "R2")
-            self.results = nexpand_component_list(self.results, r2_r3_c1_c2, "R2", "R3", "C1", "C2")
-            self.results = nexpand_component_list(self.results, r8_r7_r6, "R8", "R7", "R6")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r4_r1, "R4", "R1"),
+                (r1_r2, "R1", "R2"),
+                (r2_r3_c1_c2, "R2", "R3", "C1", "C2"),
+                (r8_r7_r6, "R8", "R7", "R6")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # --------------- #
     # Private Methods #
@@ -602,7 +604,7 @@ class FleischerTowLowPass(Cell):
             )
 
             # Random values for R7 and R8
-            r7 = r8 = random_commercial(ComponentType.Resistor)
+            r7 = r8 = random_commercial(ComponentType.Resistor, *PRACTICAL_RANGES["R"])
 
             # Using R2 values, get possible values for R3 and C=C1=C2
             r3_c1_c2_r2_r1 = []
@@ -619,11 +621,12 @@ class FleischerTowLowPass(Cell):
                         r3_c1_c2_r2_r1.append((r3, c, c, r2, commercial))
 
             # Cross selection
-            self.results = nexpand_component_list(self.results, r3_c1_c2_r2_r1, "R3", "C1", "C2", "R2", "R1")
-            self.results = nexpand_component_list(self.results, r2_r5, "R2", "R5")
-            self.results = nexpand_component_list(self.results, [(r7, r8)], "R7", "R8")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r3_c1_c2_r2_r1, "R3", "C1", "C2", "R2", "R1"),
+                (r2_r5, "R2", "R5"),
+                ([(r7, r8)], "R7", "R8")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # --------------- #
     # Private Methods #
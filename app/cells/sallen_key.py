@@ -1,11 +1,11 @@
-# Python native modules
-from math import sqrt
+# Third-party modules
+from numpy import sqrt
 
 # Project modules
 from app.cells.electronics import compute_commercial_by_iteration_list
 from app.cells.electronics import compute_commercial_by_iteration
 from app.cells.electronics import matches_commercial_values
-from app.cells.electronics import nexpand_component_list
+from app.cells.electronics import join_component_options
 from app.cells.electronics import ComponentType
 
 from app.cells.cell import CellErrorCodes
@@ -126,10 +126,11 @@ class SallenKeyLowPassGain(Cell):
                     r1_r2_c1_c2.append((commercial, commercial, c1, c2))
 
             # Cross selection of possible values of components
-            self.results = nexpand_component_list(self.results, ra_rb, "Ra", "Rb")
-            self.results = nexpand_component_list(self.results, r1_r2_c1_c2, "R1", "R2", "C1", "C2")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (ra_rb, "Ra", "Rb"),
+                (r1_r2_c1_c2, "R1", "R2", "C1", "C2")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # ------------------------ #
     # Private Internal Methods #
@@ -274,9 +275,10 @@ class SallenKeyLowPassUnityGain(Cell):
                     r1_r2_c1_c2.append((commercial, commercial, c1, c2))
 
             # Cross selection of possible values of components
-            self.results = nexpand_component_list(self.results, r1_r2_c1_c2, "R1", "R2", "C1", "C2")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (r1_r2_c1_c2, "R1", "R2", "C1", "C2")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # ------------------------ #
     # Private Internal Methods #
@@ -410,10 +412,11 @@ class SallenKeyLowPassAttenuation(Cell):
                 r1a_r1b.append((r1a, r1b))
 
             # Cross selection of possible values of components
-            self.results = nexpand_component_list(self.results, [(r2, c1, c2) for _, r2, c1, c2 in r1_r2_c1_c2], "R2", "C1", "C2")
-            self.results = nexpand_component_list(self.results, r1a_r1b, "R1A", "R1B")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                ([(r2, c1, c2) for _, r2, c1, c2 in r1_r2_c1_c2], "R2", "C1", "C2"),
+                (r1a_r1b, "R1A", "R1B")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # ------------------------ #
     # Private Internal Methods #
@@ -523,10 +526,11 @@ class SallenKeyHighPassGain(SallenKeyLowPassGain):
                     r1_r2_c1_c2.append((r1, r2, commercial, commercial))
 
             # Cross selection of possible values of components
-            self.results = nexpand_component_list(self.results, ra_rb, "Ra", "Rb")
-            self.results = nexpand_component_list(self.results, r1_r2_c1_c2, "R1", "R2", "C1", "C2")
-            self.flush_results()
-            self.choose_random_result()
+            groups = join_component_options(
+                (ra_rb, "Ra", "Rb"),
+                (r1_r2_c1_c2, "R1", "R2", "C1", "C2")
+            )
+            self.rank_results(groups, zeros, poles, gain, stop_at_first)
 
     # -------------- #
     # Static Methods #
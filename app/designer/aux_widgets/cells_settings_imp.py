@@ -107,7 +107,7 @@ class CellsSettings(QtWid.QWidget, Ui_CellsSettings):
 
 
         self.cell_designers[cell_selected].set_cell(cell_type, gain)
-        self.cell_designers[cell_selected].design_components(zeros, poles, gain)
+        self.cell_designers[cell_selected].design_components(zeros, poles, gain, stop_at_first=True)
 
         # Adding components
         components = self.cell_designers[cell_selected].get_components()
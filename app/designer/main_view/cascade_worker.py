@@ -0,0 +1,58 @@
+# Third-party modules
+import PyQt5.QtCore as QtCore
+
+# Python native modules
+from copy import deepcopy
+
+# filters-tool project modules
+from app.cascader.cascader import AutomaticCascader
+from app.cascader.cascader import CascadeCancelled
+
+
+class CascadeWorker(QtCore.QThread):
+    """ Runs the automatic cascade out of the GUI thread, emitting the progress of each step and delivering
+    the resulting stages through signals. The worker uses its own AutomaticCascader and copies of the pole
+    and zero blocks, marking them as used, so the GUI can keep using its own ones while it runs and take
+    these ones once the cascade is finished. """
+
+    # Step being computed ('pairings', 'orders' or 'gains') and candidates evaluated in it
+    progress = QtCore.pyqtSignal(str, int)
+
+    # Index and data of each stage of the cascade, emitted in order once the cascade is finished
+    stage_ready = QtCore.pyqtSignal(int, object)
+
+    # Emitted after the last stage, or when the cascade was cancelled
+    cascade_finished = QtCore.pyqtSignal()
+    cascade_cancelled = QtCore.pyqtSignal()
+
+    def __init__(self, zero_blocks, pole_blocks, gain, *args, **kwargs):
+        super(CascadeWorker, self).__init__(*args, **kwargs)
+        self.cascader = AutomaticCascader()
+        self.zero_blocks = deepcopy(zero_blocks)
+        self.pole_blocks = deepcopy(pole_blocks)
+        self.gain = gain
+
+    def run(self):
+        self.cascader.set_zeros_poles_gain(self.zero_blocks, self.pole_blocks, self.gain)
+        self.cascader.progress_callback = self.progress.emit
+        try:
+            self.cascader.separate_in_stages()
+            self.cascader.sort_stages()
+            self.cascader.assign_gains()
+        except CascadeCancelled:
+            cancelled = True
+        else:
+            cancelled = False
+        finally:
+            self.cascader.progress_callback = None
+
+        if cancelled:
+            self.cascade_cancelled.emit()
+        else:
+            for i in range(len(self.cascader.stages)):
+                self.stage_ready.emit(i, self.cascader.stages[i])
+            self.cascade_finished.emit()
+
+    def cancel(self):
+        """ Cancels the cascade, the worker stops at the next progress report of the cascader. """
+        self.cascader.cancel()
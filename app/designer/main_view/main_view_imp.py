@@ -26,6 +26,8 @@ from app.approximators.approximator import ApproximationErrorCode
 from app.plotter.plotter import FilterPlotter
 from app.auxiliary_calculators.wp_w0_q import SecondOrderAuxCalc
 from app.cascader.cascader import AutomaticCascader
+from app.cascader.cascade_model import CascadeModel
+from app.designer.main_view.cascade_worker import CascadeWorker
 
 FILTER_INDEX_TO_NAME = ['low-pass', 'high-pass', 'band-pass', 'band-stop', 'group-delay']
 
@@ -44,10 +46,8 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         # Creating auxiliary calculators
         self.second_order_calc = SecondOrderAuxCalc()
         self.cascader = AutomaticCascader()
-
-        # Auxiliary widgets
-        self.warning_message = QtWid.QMessageBox()
-        self.automatic_cascade_warning()
+        self.cascade_worker = None
+        self.cascade_model = CascadeModel()
 
         # Signal and slot connections
         self.filter_selector.currentIndexChanged.connect(self.filter_selected)
@@ -142,6 +142,10 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
             self.second_order_calc = SecondOrderAuxCalc(tf)
             self.fill_poles_and_zeros_lists()
 
+            # Loading every pole and zero into the cascader, so cascades built by hand share its frequencies
+            gain = self.filter_data_widgets[filter_index].gain.value()
+            self.cascader.set_zeros_poles_gain(self.second_order_calc.zero_blocks, self.second_order_calc.pole_blocks, gain)
+
             # Clearing stages_list
             self.stages_list.clear()
 
@@ -165,31 +169,18 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
     def plot_stage(self):
         current_item = self.stages_list.currentItem()
         stage_index = self.stages_list.row(current_item)
+        if stage_index < 0:
+            return
+
+        # Only the responses of the stages changed are computed again by the model
+        stages = [self.stages_list.itemWidget(self.stages_list.item(i)).cell_data for i in range(self.stages_list.count())]
+        self.cascade_model.set_stages(stages)
 
         if self.accumulative_plot.isChecked():
-            start = 0
+            response = self.cascade_model.cumulative_response(stage_index)
         else:
-            start = stage_index
-
-        poles_list = []
-        zeros_list = []
-        total_gain = 1
-        for i in range(start,stage_index + 1):
-            widget = self.stages_list.itemWidget(self.stages_list.item(i))
-            if widget.cell_data['zero'] is not None:
-                zeros = [zero * 2*np.pi for zero in widget.cell_data['zero']['zeros']]
-            else:
-                zeros = []
-            zeros_list += zeros
-            poles = [pole * 2*np.pi for pole in widget.cell_data['pole']['poles']]
-            poles_list += poles
-
-            gain = 10**(widget.cell_data['gain_data']/20)
-            gain_needed_to_plot = self.adjust_function_gain(zeros, poles, gain)
-            total_gain *= gain_needed_to_plot
-
-        tf = ss.ZerosPolesGain(zeros_list, poles_list, total_gain)
-        self.plot_attenuation_for_stages(tf)
+            response = self.cascade_model.stage_response(stage_index)
+        self.plot_attenuation_for_stages(self.cascade_model.w, response)
 
 
     def plot_template_toggle(self):
@@ -199,8 +190,12 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
 
 
     def update_dynamic_range(self):
-        self.cascader.calculate_total_dynamic_range(v_max=self.v_max.value(), v_min=self.v_min.value())
-        self.dynamic_range.setText('{:.3f}'.format(self.cascader.total_dynamic_range))
+        # Evaluating the stages as they are in the list, the cascader only evaluates again the stages changed
+        self.cascader.stages = [
+            self.stages_list.itemWidget(self.stages_list.item(i)).cell_data for i in range(self.stages_list.count())
+        ]
+        dynamic_range = self.cascader.calculate_total_dynamic_range(v_max=self.v_max.value(), v_min=self.v_min.value())
+        self.dynamic_range.setText('{:.3f}'.format(dynamic_range))
 
 
     def update_gain_in_stage(self, stage_block_changed : QtWid.QWidget):
@@ -219,19 +214,15 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
             mb.exec()
 
         # Now plotting with new gain.
+        self.update_dynamic_range()
         self.plot_stage()
 
 
-    def automatic_cascade_warning(self):
-        self.warning_message.setIcon(QtWid.QMessageBox.Warning)
-        self.warning_message.setWindowTitle('Warning.')
-        self.warning_message.setText("If the number of stages is greater than 6, calculating all the combinations for gain distribution may take a while, resulting in a freeze of the program. Separating the stages manually is advised.")
-        self.warning_message.setStandardButtons(QtWid.QMessageBox.Ok | QtWid.QMessageBox.Cancel)
-        self.warning_message.setFixedSize(500,200)
-        #self.warning_message.buttonClicked.connect(self.)
-
-
     def calculate_automatic_cascade(self):
+        if self.cascade_worker is not None and self.cascade_worker.isRunning():
+            self.cascade_worker.cancel()
+            return
+
         self.calculate_approx()
         self.stages_list.clear()
 
@@ -241,21 +232,34 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         zero_blocks = self.second_order_calc.zero_blocks
         pole_blocks = self.second_order_calc.pole_blocks
 
-        if len(pole_blocks) > 6:
-            ret_val = self.warning_message.exec_()
-            if ret_val == 4194304:
-                return
-
         gain = self.filter_data_widgets[filter_index].gain.value()
-        self.cascader.set_zeros_poles_gain(zero_blocks, pole_blocks, gain)
 
-        self.cascader.separate_in_stages()
-        self.cascader.sort_stages()
-        self.cascader.assign_gains()
+        # Running the cascade out of the GUI thread on copies of the blocks, pressing the button again cancels it,
+        # and nothing changing the template, the stages or the voltages can be used meanwhile
+        self.cascade_worker = CascadeWorker(zero_blocks, pole_blocks, gain, self)
+        self.cascade_worker.progress.connect(self.cascade_progress)
+        self.cascade_worker.stage_ready.connect(self.stages_list.add_stage_with_data)
+        self.cascade_worker.cascade_finished.connect(self.cascade_finished)
+        self.cascade_worker.cascade_cancelled.connect(self.cascade_cancelled)
+        self.automatic_cascade.setText("Cancel")
+        self.enable_while_cascading(False)
+        self.cascade_worker.start()
+
+
+    def cascade_progress(self, step, evaluated):
+        self.statusbar.showMessage("Automatic cascade: {} {} evaluated".format(evaluated, step))
+
 
-        for i in range(len(self.cascader.stages)):
-            self.stages_list.add_stage_with_data(i, self.cascader.stages[i])
+    def cascade_finished(self):
+        self.automatic_cascade.setText("Automatic Cascade")
+        self.statusbar.clearMessage()
+        self.enable_while_cascading(True)
 
+        # Taking the blocks marked as used by the worker, referenced by the new stages, and its cascader,
+        # which already holds the responses of those stages
+        self.second_order_calc.zero_blocks = self.cascade_worker.zero_blocks
+        self.second_order_calc.pole_blocks = self.cascade_worker.pole_blocks
+        self.cascader = self.cascade_worker.cascader
         self.fill_poles_and_zeros_lists()
 
         self.v_max.setValue(15)
@@ -263,6 +267,13 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         self.update_dynamic_range()
 
 
+    def cascade_cancelled(self):
+        self.automatic_cascade.setText("Automatic Cascade")
+        self.statusbar.showMessage("Automatic cascade cancelled", 3000)
+        self.enable_while_cascading(True)
+        self.fill_poles_and_zeros_lists()
+
+
     def set_up_cells_tab(self):
         # Switching to Cells tab
         self.process_tabs.setCurrentIndex(2)
@@ -566,12 +577,9 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         self.toolbar_8.setCurrentIndex(self.toolbar_8.addWidget(toolbar))
 
 
-    def plot_attenuation_for_stages(self, transfer_function : ss.ZerosPolesGain):
-         # Loading transfer_function into plotter and setting filter type
-        self.plotters[8].set_transfer_function(transfer_function)
-
-        # Plotting attenuation
-        self.plotters[8].plot_attenuation()
+    def plot_attenuation_for_stages(self, w, response):
+        # Plotting attenuation of the response already evaluated
+        self.plotters[8].plot_attenuation_from_response(w, response)
 
         # Adding plot and navigation toolbar
         if self.stage_plot.count() > 2:
@@ -636,13 +644,18 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         self.stages_list.clean_empty_items()
 
 
+    def update_cascade(self):
+        self.fill_poles_and_zeros_lists()
+        self.update_dynamic_range()
+
+
     def pass_data_from_poles(self, data):
         for block in self.second_order_calc.pole_blocks:
             if block == data:
                 self.stages_list.dropped_data = block
 
         # Setting callback for drop event
-        self.stages_list.drop_action = self.fill_poles_and_zeros_lists
+        self.stages_list.drop_action = self.update_cascade
 
         # Cleaning data from drags of other lists
         self.zeros_list.dropped_data = {}
@@ -655,7 +668,7 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
                 self.stages_list.dropped_data = block
 
         # Setting callback for drop event
-        self.stages_list.drop_action = self.fill_poles_and_zeros_lists
+        self.stages_list.drop_action = self.update_cascade
 
         # Cleaning data from drags of other lists
         self.poles_list.dropped_data = {}
@@ -671,8 +684,8 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
                 self.zeros_list.dropped_data = data
 
         # Setting callback for drop event
-        self.poles_list.drop_action = self.fill_poles_and_zeros_lists
-        self.zeros_list.drop_action = self.fill_poles_and_zeros_lists
+        self.poles_list.drop_action = self.update_cascade
+        self.zeros_list.drop_action = self.update_cascade
 
         # Cleaning data from drags of other lists
         self.stages_list.dropped_data = {}
@@ -724,33 +737,23 @@ class MainView(QtWid.QMainWindow, Ui_MainView):
         self.v_max.setEnabled(True)
 
 
+    def enable_while_cascading(self, enabled: bool):
+        self.filter_selector.setEnabled(enabled)
+        self.approx_selector.setEnabled(enabled)
+        self.filter_data.setEnabled(enabled)
+        self.calculate_button.setEnabled(enabled)
+
+        self.poles_list.setEnabled(enabled)
+        self.zeros_list.setEnabled(enabled)
+        self.stages_list.setEnabled(enabled)
+        self.v_min.setEnabled(enabled)
+        self.v_max.setEnabled(enabled)
+        self.proceed_to_design.setEnabled(enabled)
+
+
     def copy_stage_list(self):
         self.stages_list_cells.clear()
 
         for index in range(self.stages_list.count()):
             data = self.stages_list.itemWidget(self.stages_list.item(index)).cell_data
             self.stages_list_cells.add_stage_with_data(index, data)
-
-
-    @staticmethod
-    def adjust_function_gain(zeros: list, poles: list, gain):
-        gain_in_db = 20*np.log10(gain)
-        transfer_function = ss.ZerosPolesGain(zeros, poles, gain)
-        w, mag, phase = ss.bode(transfer_function, n=1000)
-
-        dmag = np.diff(mag)/np.diff(w)
-
-        frequencies_to_check = 10
-        zero_condition = 1.0e-6
-        for i in range(len(dmag) - frequencies_to_check):
-            values_checked = []
-            for j in range(frequencies_to_check):
-                values_checked.append(dmag[i + j])
-            
-            if all([value < zero_condition for value in values_checked]):
-                frequency_to_evaluate = math.floor(i + frequencies_to_check/2)
-                max_freq = w[frequency_to_evaluate]
-                useless_1, gain_in_passband, useless_2 = ss.bode(transfer_function, [max_freq])
-                gain_in_passband = 10**(gain_in_passband[0]/20)
-                gain_needed = gain**2/gain_in_passband
-                return gain_needed
\ No newline at end of file
@@ -57,6 +57,21 @@ class FilterPlotter():
         self.f_att = [ang_freq/(2*np.pi) for ang_freq in w]
         self.attenuation = [-magnitude for magnitude in mag]
 
+        self.draw_attenuation()
+
+
+    def plot_attenuation_from_response(self, w, response):
+        '''
+        Plots the attenuation of a complex response already evaluated at the angular frequencies w.
+        '''
+        self.f_att = w / (2*np.pi)
+        self.attenuation = -20*np.log10(np.abs(response))
+        self.phase = np.angle(response, deg=True)
+
+        self.draw_attenuation()
+
+
+    def draw_attenuation(self):
         # Plotting attenuation
         self.axes.clear()
         self.axes.plot(self.f_att, self.attenuation)
@@ -0,0 +1,18 @@
+"""
+    Helpers building the data of the stages of a cascade, as given by the stages list,
+    shared by the tests of the cascader and its models.
+"""
+
+# Third-party modules
+import numpy as np
+
+
+def build_stage(fp, q, zeros=None, gain=0):
+    """ Returns the data of a second order stage with poles at fp and the given Q, with the zeros
+    and the gain in dB given, every frequency being in Hz. """
+    poles = list(np.roots([1, fp / q, fp ** 2]))
+    return {
+        'pole': {'fp': fp, 'q': q, 'n': 2, 'poles': poles, 'used': True, 'type': 'pole'},
+        'zero': None if zeros is None else {'f0': abs(zeros[0]), 'n': len(zeros), 'zeros': zeros},
+        'gain_data': gain, 'type': '', 'v_min_data': 0.01, 'v_max_data': 15
+    }
@@ -0,0 +1,46 @@
+"""
+    Testing functions to verify the batch computation of templates
+    gives the same results as computing each template on its own.
+
+    TargetClass: AttFilterApproximator
+    Testing: compute_batch
+"""
+
+# Project modules
+from app.approximators.butterworth import ButterworthApprox
+from app.approximators.cauer import CauerApprox
+from app.approximators.approximator import ApproximationErrorCode
+
+# Third-Party modules
+import numpy as np
+
+
+def test_batch_matches_compute():
+    specs = [
+        {"type": "low-pass", "fpl": 1000, "fal": 4000, "Apl": 2, "Aal": 40},
+        {"type": "low-pass", "fpl": 2000, "fal": 8000, "Apl": 2, "Aal": 40, "gain": 5},
+        {"type": "high-pass", "fpl": 4000, "fal": 1000, "Apl": 2, "Aal": 30},
+        {"type": "band-pass", "fpl": 4000, "fpr": 6000, "fal": 1000, "far": 10000, "Apl": 2, "Apr": 2, "Aal": 40, "Aar": 40}
+    ]
+
+    for approximator in [ButterworthApprox(), CauerApprox()]:
+        for spec, (zpk, order, error_code) in zip(specs, approximator.compute_batch(specs)):
+            single = type(approximator)()
+            single.set_parameters(spec)
+            assert single.compute() is error_code is ApproximationErrorCode.OK
+            assert order == len(single.get_normalised_zpk().poles)
+            assert np.allclose(np.sort_complex(zpk.poles), np.sort_complex(single.get_zpk().poles))
+            assert np.isclose(zpk.gain, single.get_zpk().gain)
+
+
+def test_batch_validation():
+    specs = np.array(
+        [("low-pass", 0, 1000, 4000), ("kevin-dewald", 0, 1000, 4000), ("low-pass", -20, 1000, 4000), ("low-pass", 0, -1000, -4000)],
+        dtype=[("type", "U16"), ("gain", float), ("fpl", float), ("fal", float)]
+    )
+    error_codes = [error_code for _, _, error_code in ButterworthApprox().compute_batch(specs)]
+
+    assert error_codes[0] is ApproximationErrorCode.INVALID_ATTE
+    assert error_codes[1] is ApproximationErrorCode.INVALID_TYPE
+    assert error_codes[2] is ApproximationErrorCode.INVALID_GAIN
+    assert error_codes[3] is ApproximationErrorCode.INVALID_FREQ
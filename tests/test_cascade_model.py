@@ -0,0 +1,35 @@
+# filters-tool project modules
+from app.cascader.cascade_model import CascadeModel
+from tests.cascade_stages import build_stage
+
+# Third-party modules
+import scipy.signal as ss
+import numpy as np
+
+
+def test_cumulative_response():
+    stages = [build_stage(1000, 0.8, gain=6), build_stage(1500, 5, [0, 0], gain=-3), build_stage(800, 3, [0], gain=10)]
+    model = CascadeModel()
+    model.set_stages(stages)
+
+    # Low pass at DC, high pass at high frequencies and band pass at its peak, with the gain of each stage
+    references = [model.w[0], model.w[-1], 800 * 2 * np.pi]
+    for i, stage in enumerate(stages):
+        gain = np.abs(ss.freqs_zpk(
+            np.array(stage['zero']['zeros'] if stage['zero'] else []) * 2 * np.pi,
+            np.array(stage['pole']['poles']) * 2 * np.pi, 1, [references[i], model.w[100]]
+        )[1])
+        expected = gain[1] / gain[0] * 10 ** (stage['gain_data'] / 20)
+        assert np.isclose(np.abs(model.stage_response(i)[100]), expected, rtol=1e-3)
+
+    expected = np.prod([model.stage_response(i) for i in range(3)], axis=0)
+    assert np.allclose(model.cumulative_response(2), expected)
+
+    # Changing a gain or a single stage keeps the products consistent
+    stages[0]['gain_data'] = 0
+    stages[2] = build_stage(700, 2, [0], gain=10)
+    model.set_stages(stages)
+    fresh = CascadeModel()
+    fresh.set_stages(stages)
+    assert np.allclose(model.w, fresh.w)
+    assert np.allclose(model.cumulative_response(2), fresh.cumulative_response(2))
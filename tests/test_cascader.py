@@ -1,5 +1,20 @@
 # filters-tool project modules
 from app.cascader.cascader import AutomaticCascader
+from app.cascader.cascader import log_distance
+from app.cascader.cascader import compositions
+from app.cascader.cascader import MIN_GAIN_PER_STAGE
+from app.cascader.cascader import frequency_grid
+from app.cascader.cascader import CascadeCancelled
+from tests.cascade_stages import build_stage
+
+# Python native modules
+from itertools import permutations
+from itertools import product
+from collections import Counter
+
+# Third-party modules
+import numpy as np
+import pytest
 
 def test_recursion():
     cascader = AutomaticCascader()
@@ -19,4 +34,133 @@ def test_recursion():
 
     cascader.set_zeros_poles_gain(zeros, poles, 0)
     cascader.separate_in_stages()
-    cascader.sort_stages()
\ No newline at end of file
+    cascader.sort_stages()
+
+
+def test_pairing():
+    cascader = AutomaticCascader()
+    assert cascader.shortest_sum_of_distances([4, 2, 1], [3, 5, None]) == (2, [[4, [5]], [2, [3]], [1, [None]]])
+    assert cascader.shortest_sum_of_distances([4, 2, 1, 10, 15], [3, 5, None, 12.5, None])[0] == 4.5
+    assert cascader.shortest_sum_of_distances([4, 2, 1], [None, 5, None])[0] == 1
+    assert cascader.shortest_sum_of_distances([4, 2, 1], [None, None, None])[0] == 0
+
+    # Measuring in decades, zeros in the origin are left to the poles far from the other zeros
+    cascader = AutomaticCascader(log_distance)
+    distance, combination = cascader.shortest_sum_of_distances([10, 100, 1000], [0, 0, 90])
+    assert [100, [90]] in combination
+
+
+def test_gain_distribution():
+    cascader = AutomaticCascader()
+    cascader.stages = [build_stage(1000, 0.8), build_stage(1200, 4, [0]), build_stage(900, 12, [3000j, -3000j])]
+    for total_gain in (-5, 0, 12):
+        cascader.total_gain = total_gain
+        cascader.assign_gains()
+        gains = [stage['gain_data'] for stage in cascader.stages]
+        assert abs(sum(gains) - total_gain) < 1e-9
+        assert min(gains) >= -MIN_GAIN_PER_STAGE
+
+        # Trying every way to distribute the gain
+        best = max(
+            cascader.calculate_total_dynamic_range(cascader.stages, way)
+            for way in compositions(3, total_gain, lower=-MIN_GAIN_PER_STAGE)
+        )
+        assert abs(cascader.total_dynamic_range - best) < 1e-9
+        assert abs(cascader.calculate_total_dynamic_range() - best) < 1e-9
+
+
+def test_response_cache():
+    cascader = AutomaticCascader()
+    cascader.stages = [build_stage(1000, 0.8), build_stage(1200, 4, [0]), build_stage(900, 12, [3000j, -3000j])]
+    cascader.assign_gains()
+    assert len(cascader.responses) == 3 and len(cascader.cumulative_gains) == 1
+
+    # New gains and orders reuse the responses of the stages
+    first = cascader.calculate_total_dynamic_range(gains=[0, 0, 0])
+    cascader.stages.reverse()
+    second = cascader.calculate_total_dynamic_range(gains=[0, 0, 0])
+    assert len(cascader.responses) == 3 and len(cascader.cumulative_gains) == 2
+    assert first != second
+
+
+def test_stage_order():
+    cascader = AutomaticCascader()
+    stages = [
+        build_stage(1000, 0.6), build_stage(1500, 8, [0]), build_stage(800, 3, [0, 0]),
+        build_stage(1200, 15, [2500j, -2500j]), build_stage(900, 1.2)
+    ]
+
+    def ordering_loss(order):
+        w = frequency_grid(order)
+        cumulative = np.cumsum([cascader.stage_response(stage, w)[0] for stage in order], axis=0)
+        reference = np.argmax(cumulative[-1])
+        return np.max(np.max(cumulative, axis=1) - cumulative[:, reference])
+
+    best = min(ordering_loss(list(order)) for order in permutations(stages))
+    assert abs(ordering_loss(cascader.optimise_order(stages)) - best) < 1e-9
+
+    # Without time to search, the given order is kept
+    assert cascader.optimise_order(stages, 0) == stages
+
+
+def test_progress_and_cancel():
+    cascader = AutomaticCascader()
+    stages = [build_stage(1000, 0.6), build_stage(1500, 8, [0]), build_stage(800, 3, [0, 0])]
+
+    reports = []
+    cascader.progress_callback = lambda step, evaluated: reports.append((step, evaluated))
+    cascader.stages = cascader.optimise_order(stages)
+    cascader.assign_gains()
+    assert [step for step, evaluated in reports] == ['orders', 'gains']
+    assert all(evaluated > 0 for step, evaluated in reports)
+
+    # Cancelling stops the cascader at the next progress report
+    cascader.cancel()
+    with pytest.raises(CascadeCancelled):
+        cascader.assign_gains()
+
+
+def test_incremental_dynamic_range():
+    stages = [
+        build_stage(1000, 0.6), build_stage(1500, 8, [0]), build_stage(800, 3, [0, 0]),
+        build_stage(1200, 15, [2500j, -2500j]), build_stage(900, 1.2)
+    ]
+    cascader = AutomaticCascader()
+    cascader.set_zeros_poles_gain(
+        [stage['zero'] for stage in stages if stage['zero'] is not None], [stage['pole'] for stage in stages], 10
+    )
+    cascader.stages = stages
+    cascader.assign_gains()
+
+    # Moving a zero between the last stages only evaluates those stages again
+    edited = [dict(stage) for stage in stages]
+    edited[3]['zero'], edited[4]['zero'] = None, stages[3]['zero']
+    evaluated = len(cascader.responses)
+    dr = cascader.calculate_total_dynamic_range(edited)
+    assert len(cascader.responses) == evaluated + 2
+    assert np.allclose(cascader.last_peaks[:3], cascader.calculate_cumulative_gains(stages)[0][:3])
+
+    fresh = AutomaticCascader()
+    fresh.w = cascader.w
+    assert abs(fresh.calculate_total_dynamic_range(edited) - dr) < 1e-9
+
+
+def test_compositions():
+    assert list(compositions(4, 6)) == sorted(list(way) for way in product(range(7), repeat=4) if sum(way) == 6)
+
+    # Bounded parts, in lexicographic order
+    lower, upper = [-5, -5, 0], [10, 3, 8]
+    expected = [
+        list(way) for way in product(*[range(low, high + 1) for low, high in zip(lower, upper)]) if sum(way) == 7
+    ]
+    assert list(compositions(3, 7, lower, upper)) == expected
+    assert list(compositions(2, 5, upper=2)) == []
+
+    # Samples are drawn uniformly, every value of the first stage getting its share
+    samples = list(compositions(3, 7, lower, upper, samples=len(expected) * 100, seed=0))
+    counts = Counter(tuple(way) for way in samples)
+    assert set(counts) == set(tuple(way) for way in expected)
+    assert min(counts.values()) > 50 and max(counts.values()) < 150
+    first = Counter(way[0] for way in samples)
+    for value in set(way[0] for way in expected):
+        assert abs(first[value] - 100 * sum(way[0] == value for way in expected)) <= 1
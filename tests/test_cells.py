@@ -1,4 +1,6 @@
 # third-party modules
+from sympy import symbols
+import numpy as np
 import pytest
 
 # python native modules
@@ -22,6 +24,8 @@ from app.cells.fleischer_tow import FleischerTowLowPass
 from app.cells.fleischer_tow import FleischerTowHighPass
 
 from app.cells.cell import CellErrorCodes
+from app.cells.cell import RESULTS_KEPT
+from app.cells.cell import PRACTICAL_RANGES
 
 
 @pytest.fixture
@@ -84,3 +88,79 @@ def test_design(cell):
     )
 
     print(cell.components)
+
+
+def test_calculate_with_components():
+    r1, r2, c1 = symbols("R1 R2 C1")
+    cell = CompensatedIntegrator()
+    cell.components = {"R1": 1000, "R2": 2200, "C1": 10e-9}
+    assert abs(cell.calculate_with_components(1 / (r2 * c1)) - 1 / (2200 * 10e-9)) < 1e-6
+    assert abs(cell.calculate_with_components(-r2 / r1) + 2.2) < 1e-12
+
+    # Arrays of candidate values are evaluated at once
+    assert np.allclose(cell.calculate_with_components(-r2 / r1, R2=np.array([1000, 4700])), [-1, -4.7])
+
+
+def test_ranked_design():
+    zeros, poles, gain = {"wz": 2 * pi * 10000}, {"wp": 2 * pi * 10000, "qp": 4.5}, -1
+
+    # Best results are kept sorted by score, the best one being selected as components
+    cell = FleischerTowBandStop()
+    cell.set_error(0.05)
+    cell.design_components(zeros, poles, gain)
+    results = cell.get_results()
+    assert len(results) == RESULTS_KEPT
+    assert cell.components == results[0]
+    scores = []
+    for result in results:
+        cell.components = result
+        scores.append(cell.score_components(cell.parameters_error(zeros, poles, gain)))
+    assert scores == sorted(scores)
+
+    # Stopping at the first design meeting the targets within the error tolerance
+    first = FleischerTowBandStop()
+    first.set_error(0.05)
+    first.design_components(zeros, poles, gain, stop_at_first=True)
+    assert len(first.get_results()) == 1
+    assert first.parameters_error(zeros, poles, gain) <= 0.05
+
+
+def test_independent_groups():
+    # Gain resistors and the rest of components are independent groups, combining only the best of each
+    zeros, poles = {}, {"wp": 2 * pi * 10000, "qp": 0.6}
+    cell = SallenKeyLowPassAttenuation()
+    cell.set_error(0.05)
+    cell.design_components(zeros, poles, 0.5)
+    results = cell.get_results()
+    assert len(results) == RESULTS_KEPT
+    assert all(result.keys() == cell.components.keys() for result in results)
+    assert len({tuple(sorted(result.items())) for result in results}) == RESULTS_KEPT
+    assert cell.parameters_error(zeros, poles, 0.5) <= 0.05
+
+
+@pytest.mark.parametrize("cell_class, zeros, poles, gain", [
+    (CompensatedIntegrator, {"wz": 0}, {"wp": 2 * pi * 10000}, -2),
+    (SallenKeyLowPassUnityGain, {}, {"wp": 2 * pi * 10000, "qp": 0.6}, 1),
+    (FleischerTowBandStop, {"wz": 2 * pi * 10000}, {"wp": 2 * pi * 10000, "qp": 4.5}, -1),
+    (FleischerTowLowPass, {}, {"wp": 2 * pi * 10000, "qp": 4.5}, -1)
+])
+@pytest.mark.parametrize("stop_at_first", [False, True])
+def test_practical_design(cell_class, zeros, poles, gain, stop_at_first):
+    # Using the default tolerance, either ranking every design or taking the first acceptable one
+    cell = cell_class()
+    cell.design_components(zeros, poles, gain, stop_at_first=stop_at_first)
+    for label, value in cell.get_components().items():
+        lowest, highest = PRACTICAL_RANGES[label[0]]
+        assert lowest <= value <= highest
+    assert cell.is_within_tolerance()
+    assert cell.parameters_error(zeros, poles, gain) <= cell.error
+
+
+def test_design_out_of_tolerance():
+    # No set of commercial components meets the targets, the best one is kept but flagged
+    zeros, poles, gain = {}, {"wp": 2 * pi * 10000, "qp": 2}, 2
+    cell = SallenKeyLowPassGain()
+    cell.design_components(zeros, poles, gain, stop_at_first=True)
+    assert cell.get_results()
+    assert not cell.is_within_tolerance()
+    assert cell.parameters_error(zeros, poles, gain) > cell.error
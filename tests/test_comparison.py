@@ -0,0 +1,43 @@
+# filters-tool project modules
+from app.approximators.approximator import ApproximationErrorCode
+from app.approximators.comparison import compare_approximations
+from app.approximators.comparison import GROUP_DELAY_APPROXIMATIONS
+
+
+def test_compare_attenuation():
+    template = {'type': 'low-pass', 'fpl': 1000, 'fal': 3000, 'Apl': 1, 'Aal': 40}
+    rows = compare_approximations(template, max_workers=2)
+    assert [row['order'] for row in rows] == sorted(row['order'] for row in rows)
+    order = {row['approximation']: row['order'] for row in rows}
+    assert order['Cauer'] <= order['Chebyshev I'] <= order['Legendre'] <= order['Butterworth']
+    for row in rows:
+        assert row['error_code'] is ApproximationErrorCode.OK
+        assert row['stages'] == (row['order'] + 1) // 2
+        assert row['order'] == len(row['zpk'].poles)
+
+    # Butterworth has a monotonic pass band, Chebyshev I uses the whole ripple
+    ripple = {row['approximation']: row['ripple'] for row in rows}
+    assert abs(ripple['Chebyshev I'] - 1) < 1e-3
+    assert ripple['Butterworth'] <= 1 + 1e-3
+
+
+def test_compare_group_delay():
+    template = {'type': 'group-delay', 'fa': 2000, 'Aa': 20, 'ft': 500, 'group_delay': 0.5, 'tol': 10}
+    rows = compare_approximations(template, parallel=False)
+    assert {row['approximation'] for row in rows} == set(GROUP_DELAY_APPROXIMATIONS)
+    for row in rows:
+        assert row['error_code'] is ApproximationErrorCode.OK
+        assert 0 < row['flatness'] <= 10
+        assert row['ripple'] > 0
+
+
+def test_compare_band_pass():
+    template = {
+        'type': 'band-pass', 'fpl': 4000, 'fpr': 6000, 'fal': 1000, 'far': 10000,
+        'Apl': 2, 'Apr': 2, 'Aal': 40, 'Aar': 40
+    }
+    rows = compare_approximations(template, parallel=False)
+    for row in rows:
+        assert row['error_code'] is ApproximationErrorCode.OK
+        assert 2 * row['order'] == len(row['zpk'].poles)
+        assert row['stages'] == row['order']
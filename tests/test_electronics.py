@@ -0,0 +1,122 @@
+# third-party modules
+from sympy import symbols
+import numpy as np
+
+# project modules
+from app.cells.electronics import compute_commercial_by_iteration
+from app.cells.electronics import build_expression_callback
+from app.cells.electronics import COMPILED_EXPRESSIONS
+from app.cells.electronics import match_commercial_values
+from app.cells.electronics import matches_commercial_values
+from app.cells.electronics import get_commercial_array
+from app.cells.electronics import join_component_options
+from app.cells.electronics import ComponentTable
+from app.cells.electronics import set_commercial_series
+from app.cells.electronics import random_commercial
+from app.cells.electronics import COMMERCIAL_SERIES
+from app.cells.electronics import COMMERCIAL_RANGES
+from app.cells.electronics import E_SERIES
+from app.cells.electronics import ComponentType
+
+# E192 series as published in IEC 60063
+E192 = [
+    1.00, 1.01, 1.02, 1.04, 1.05, 1.06, 1.07, 1.09, 1.10, 1.11, 1.13, 1.14, 1.15, 1.17, 1.18, 1.20,
+    1.21, 1.23, 1.24, 1.26, 1.27, 1.29, 1.30, 1.32, 1.33, 1.35, 1.37, 1.38, 1.40, 1.42, 1.43, 1.45,
+    1.47, 1.49, 1.50, 1.52, 1.54, 1.56, 1.58, 1.60, 1.62, 1.64, 1.65, 1.67, 1.69, 1.72, 1.74, 1.76,
+    1.78, 1.80, 1.82, 1.84, 1.87, 1.89, 1.91, 1.93, 1.96, 1.98, 2.00, 2.03, 2.05, 2.08, 2.10, 2.13,
+    2.15, 2.18, 2.21, 2.23, 2.26, 2.29, 2.32, 2.34, 2.37, 2.40, 2.43, 2.46, 2.49, 2.52, 2.55, 2.58,
+    2.61, 2.64, 2.67, 2.71, 2.74, 2.77, 2.80, 2.84, 2.87, 2.91, 2.94, 2.98, 3.01, 3.05, 3.09, 3.12,
+    3.16, 3.20, 3.24, 3.28, 3.32, 3.36, 3.40, 3.44, 3.48, 3.52, 3.57, 3.61, 3.65, 3.70, 3.74, 3.79,
+    3.83, 3.88, 3.92, 3.97, 4.02, 4.07, 4.12, 4.17, 4.22, 4.27, 4.32, 4.37, 4.42, 4.48, 4.53, 4.59,
+    4.64, 4.70, 4.75, 4.81, 4.87, 4.93, 4.99, 5.05, 5.11, 5.17, 5.23, 5.30, 5.36, 5.42, 5.49, 5.56,
+    5.62, 5.69, 5.76, 5.83, 5.90, 5.97, 6.04, 6.12, 6.19, 6.26, 6.34, 6.42, 6.49, 6.57, 6.65, 6.73,
+    6.81, 6.90, 6.98, 7.06, 7.15, 7.23, 7.32, 7.41, 7.50, 7.59, 7.68, 7.77, 7.87, 7.96, 8.06, 8.16,
+    8.25, 8.35, 8.45, 8.56, 8.66, 8.76, 8.87, 8.98, 9.09, 9.20, 9.31, 9.42, 9.53, 9.65, 9.76, 9.88
+]
+
+
+def test_match_commercial_values():
+    matches, commercial = match_commercial_values(
+        ComponentType.Resistor, [4700, 4750, 5300, 1e9, -1000, np.nan], 0.02
+    )
+    assert matches.tolist() == [True, True, False, False, False, False]
+    assert commercial[:2].tolist() == [4700, 4700]
+
+    assert matches_commercial_values(ComponentType.Capacitor, 10.5e-9, 0.1) == (True, 10e-9)
+    assert matches_commercial_values(ComponentType.Capacitor, 10.5e-9, 0.01) == (False, None)
+
+
+def test_commercial_by_iteration():
+    resistors = get_commercial_array(ComponentType.Resistor)
+
+    # Vectorised callbacks and scalar only callbacks give the same matches
+    results = compute_commercial_by_iteration(ComponentType.Resistor, ComponentType.Resistor, lambda r: 2.2 * r, 0.01)
+    scalar = compute_commercial_by_iteration(
+        ComponentType.Resistor, ComponentType.Resistor, lambda r: float(2.2 * float(r)), 0.01
+    )
+    assert results == scalar
+    assert results
+    for r1, r2 in results:
+        assert r1 in resistors and r2 in resistors
+        assert abs(r1 - 2.2 * r2) <= 0.01 * max(r1, 2.2 * r2)
+
+
+def test_commercial_series():
+    assert E_SERIES["E192"] == E192
+    assert E_SERIES["E96"] == E192[::2]
+    assert E_SERIES["E48"] == E192[::4]
+
+    series = COMMERCIAL_SERIES[ComponentType.Resistor]
+    try:
+        set_commercial_series(ComponentType.Resistor, "E192")
+        resistors = get_commercial_array(ComponentType.Resistor)
+        assert 9200 in resistors and 9190 not in resistors
+        assert matches_commercial_values(ComponentType.Resistor, 9195, 0.001) == (True, 9200)
+
+        # Random values come from the series and range in use
+        lowest, highest = COMMERCIAL_RANGES[ComponentType.Resistor]
+        for _ in range(100):
+            value = random_commercial(ComponentType.Resistor)
+            assert value in resistors and lowest <= value <= highest
+            assert 1e3 <= random_commercial(ComponentType.Resistor, 1e3, 1e6) <= 1e6
+    finally:
+        set_commercial_series(ComponentType.Resistor, series)
+
+
+def test_expression_callback():
+    r, c = symbols("R C")
+    callback = build_expression_callback(1 / (r * c), 1000, r)
+    compiled = len(COMPILED_EXPRESSIONS)
+    build_expression_callback(1 / (r * c), 1000, r)
+    assert len(COMPILED_EXPRESSIONS) == compiled
+
+    # Compiled callbacks take scalars and whole arrays of values
+    assert np.isclose(callback(1e-6), 1000)
+    assert np.allclose(callback(np.array([1e-6, 2e-6])), [1000, 500])
+    results = compute_commercial_by_iteration(ComponentType.Resistor, ComponentType.Capacitor, callback, 0.01)
+    assert results and all(abs(r1 * c1 * 1000 - 1) <= 0.011 for r1, c1 in results)
+
+
+def test_component_table_join():
+    r1_r2 = [(1, 2), (1, 3), (4, 2), (5, 6)]
+    r2_c1 = [(2, 10), (2, 20), (3, 30), (7, 40)]
+    c1_r3 = [(10, 100), (30, 300), (30, 400)]
+
+    # Every combination sharing the same values of the shared labels, and only complete ones
+    expected = sorted(
+        (r1, r2, c1, r3)
+        for r1, r2 in r1_r2 for r2_b, c1 in r2_c1 for c1_b, r3 in c1_r3
+        if r2 == r2_b and c1 == c1_b
+    )
+    [table] = join_component_options((r1_r2, "R1", "R2"), (c1_r3, "C1", "R3"), (r2_c1, "R2", "C1"))
+    results = table.rows()
+    assert sorted((r["R1"], r["R2"], r["C1"], r["R3"]) for r in results) == expected
+
+    # Tables sharing no labels are crossed, but independent options are kept in separate tables
+    assert len(ComponentTable.from_options(r1_r2, "R1", "R2").join(ComponentTable.from_options(c1_r3, "C1", "R3"))) == 12
+    tables = join_component_options((r1_r2, "R1", "R2"), (c1_r3, "C1", "R3"))
+    assert [(table.labels(), len(table)) for table in tables] == [(["R1", "R2"], 4), (["C1", "R3"], 3)]
+
+    # Tables without matches give no components
+    assert join_component_options((r1_r2, "R1", "R2"), ([(8, 1)], "R2", "C1"))[0].rows() == []
+    assert join_component_options(([], "R1", "R2"), (r2_c1, "R2", "C1"))[0].rows() == []
@@ -0,0 +1,40 @@
+# filters-tool project modules
+from app.cascader.cascader import AutomaticCascader
+from app.cascader.evaluation import evaluate_cascades
+from tests.cascade_stages import build_stage
+
+# Python native modules
+from itertools import permutations
+
+# Third-party modules
+import numpy as np
+
+
+def test_best_cascades():
+    stages = [
+        build_stage(1000, 0.6), build_stage(1500, 8, [0]), build_stage(800, 3, [0, 0]),
+        build_stage(1200, 15, [2500j, -2500j]), build_stage(900, 1.2)
+    ]
+    candidates = list(permutations(range(len(stages))))
+
+    # Scoring every ordering with the gains assigned by the cascader
+    cascader = AutomaticCascader()
+    scores = []
+    for order in candidates:
+        cascader.stages = [dict(stages[i]) for i in order]
+        cascader.total_gain = 10
+        cascader.assign_gains()
+        scores.append(cascader.total_dynamic_range)
+    expected = sorted(scores, reverse=True)[:4]
+
+    serial = evaluate_cascades(stages, candidates, 10, top_k=4, parallel=False, chunk_size=7)
+    parallel = evaluate_cascades(stages, iter(candidates), 10, top_k=4, max_workers=2, chunk_size=7)
+    for best in (serial, parallel):
+        assert np.allclose([row['dynamic_range'] for row in best], expected)
+        for row in best:
+            assert abs(sum(row['gains']) - 10) < 1e-9
+            assert abs(scores[candidates.index(tuple(row['stages']))] - row['dynamic_range']) < 1e-9
+    assert [row['stages'] for row in serial] == [row['stages'] for row in parallel]
+
+    # Stages are not modified by the evaluation
+    assert all(stage['gain_data'] == 0 for stage in stages)
@@ -0,0 +1,30 @@
+# Third-party modules
+import scipy.signal as ss
+import numpy as np
+
+# filters-tool project modules
+from app.approximators.approximator import MAXIMUM_ORDER
+from app.approximators.approximator import group_delay_response
+from app.approximators.gauss import compute_normalised_poles
+from app.approximators.gauss import GaussApprox
+
+
+def test_normalised_poles():
+    for n in range(1, MAXIMUM_ORDER + 1):
+        poles = np.array(compute_normalised_poles(n))
+        assert len(poles) == n
+        assert np.all(poles.real < 0)
+
+        # Unit group delay at DC and a monotonic magnitude, as the Gaussian response
+        zpk = ss.ZerosPolesGain([], poles, np.prod(np.abs(poles)))
+        assert abs(group_delay_response(zpk, [0])[0] - 1) < 1e-9
+        _, h = ss.freqs_zpk(zpk.zeros, zpk.poles, zpk.gain, worN=np.linspace(0, 10, 1001))
+        assert abs(np.abs(h[0]) - 1) < 1e-9
+        assert np.all(np.diff(np.abs(h)) <= 1e-12)
+
+
+def test_order_search():
+    approximator = GaussApprox()
+    approximator.fa, approximator.Aa, approximator.ft, approximator.group_delay, approximator.tol = 2000, 20, 500, 0.5, 10
+    assert approximator.compute().value == "OK"
+    assert len(approximator.get_zpk().poles) == approximator.denorm_order
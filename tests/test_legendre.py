@@ -0,0 +1,30 @@
+# Third-party modules
+import scipy.signal as ss
+import numpy as np
+
+# Python native modules
+from fractions import Fraction
+
+# filters-tool project modules
+from app.approximators.legendre import LegendreApprox
+from app.approximators.legendre import compute_integrated_coefficients
+
+
+def test_integrated_coefficients():
+    # Known optimum L polynomials of the third and fourth order in x = w^2
+    assert compute_integrated_coefficients(3) == (Fraction(3), Fraction(-3), Fraction(1), Fraction(0))
+    assert compute_integrated_coefficients(4) == (Fraction(6), Fraction(-8), Fraction(3), Fraction(0), Fraction(0))
+    for n in range(1, 26):
+        assert sum(compute_integrated_coefficients(n)) == 1
+
+
+def test_high_order_prototype():
+    ap = 1
+    for n in (20, 25):
+        zeros, poles, gain = LegendreApprox.compute_prototype(ap, n)
+        assert len(poles) == n
+        assert np.all(np.real(poles) < 0)
+
+        _, h = ss.freqs_zpk(zeros, poles, 1, worN=[1e-9, 1])
+        attenuation = 20 * np.log10(np.abs(h[0]) / np.abs(h[1]))
+        assert abs(attenuation - ap) < 1e-6
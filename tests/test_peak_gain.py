@@ -0,0 +1,42 @@
+# filters-tool project modules
+from app.auxiliary_calculators.peak_gain import peak_gain
+from app.auxiliary_calculators.peak_gain import cell_coefficients
+from app.auxiliary_calculators.peak_gain import roots_coefficients
+
+# Third-party modules
+import scipy.signal as ss
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("cell_type, w0", [
+    ('low-pass', None), ('high-pass', None), ('band-pass', None),
+    ('notch', None), ('low-pass-notch', 2.5), ('high-pass-notch', 0.4)
+])
+def test_cell_peaks(cell_type, w0):
+    wp = np.array([1, 1, 1, 1.5, 0.8])
+    q = np.array([0.3, 0.7071, 1, 4, 25])
+    numerators, denominators = cell_coefficients(cell_type, wp, q, w0)
+    peaks, frequencies = peak_gain(numerators, denominators)
+
+    # Comparing against a dense scan of the response of each cell, which can only approach the peak
+    w = np.geomspace(1e-3, 1e3, 200001)
+    for i in range(len(wp)):
+        magnitude = np.abs(ss.freqs(numerators[i], denominators[i], w)[1])
+        assert peaks[i] >= np.max(magnitude) * (1 - 1e-9)
+        assert np.isclose(peaks[i], np.max(magnitude), rtol=1e-4)
+        if np.isfinite(frequencies[i]):
+            assert np.isclose(np.abs(ss.freqs(numerators[i], denominators[i], [frequencies[i]])[1][0]), peaks[i])
+
+
+def test_known_peaks():
+    # Low-pass peak Q / sqrt(1 - 1/4Q²) at wp sqrt(1 - 1/2Q²), band-pass peak at wp
+    peaks, frequencies = peak_gain(*cell_coefficients('low-pass', 2, 5))
+    assert np.isclose(peaks, 5 / np.sqrt(1 - 1 / 100))
+    assert np.isclose(frequencies, 2 * np.sqrt(1 - 1 / 50))
+    peaks, frequencies = peak_gain(*cell_coefficients('band-pass', 2, 5))
+    assert np.isclose(peaks, 1) and np.isclose(frequencies, 2)
+
+    # First order stages, flat at DC or at high frequencies
+    assert peak_gain(roots_coefficients([]), roots_coefficients([-3])) == (1 / 3, 0)
+    assert peak_gain(roots_coefficients([0]), roots_coefficients([-3])) == (1, np.inf)
@@ -0,0 +1,63 @@
+"""
+    Testing functions to verify the cache of normalised prototypes shared by the approximators,
+    built once for each approximation, order and attenuations.
+"""
+
+# Third-party modules
+import numpy as np
+
+# filters-tool project modules
+from app.approximators.prototypes import PrototypeCache
+from app.approximators.prototypes import PROTOTYPE_CACHE
+from app.approximators.butterworth import ButterworthApprox
+from app.approximators.cauer import CauerApprox
+
+
+def test_cache_eviction():
+    cache = PrototypeCache(2)
+    builds = []
+
+    def builder(value):
+        builds.append(value)
+        return [], [-value], value
+
+    cache.get_prototype(1, lambda: builder(1))
+    cache.get_prototype(2, lambda: builder(2))
+    cache.get_prototype(1, lambda: builder(1))
+    cache.get_prototype(3, lambda: builder(3))
+    cache.get_prototype(1, lambda: builder(1))
+    cache.get_prototype(2, lambda: builder(2))
+    assert builds == [1, 2, 3, 2]
+    assert cache.get_statistics() == {"hits": 2, "misses": 4, "evictions": 2, "size": 2}
+
+
+def test_cache_returns_copies():
+    cache = PrototypeCache()
+    zeros, poles, gain = cache.get_prototype("key", lambda: ([], [-1, -2], 2))
+    poles[0] = 0
+    zeros, poles, gain = cache.get_prototype("key", lambda: ([], [0, 0], 0))
+    assert np.all(poles == [-1, -2]) and gain == 2
+
+
+def test_approximators_share_prototypes():
+    PROTOTYPE_CACHE.clear()
+    first = CauerApprox()
+    first.fpl, first.fal, first.Apl, first.Aal, first.gain = 1000, 2000, 1, 40, 0
+    first.ord = 4
+    first.compute()
+    misses = PROTOTYPE_CACHE.get_statistics()["misses"]
+
+    # Same approximation, order and attenuations, the key of the prototype, with other frequencies
+    # in another approximator instance
+    second = CauerApprox()
+    second.fpl, second.fal, second.Apl, second.Aal, second.gain = 5000, 10000, 1, 40, 0
+    second.ord = 4
+    second.compute()
+    assert PROTOTYPE_CACHE.get_statistics()["misses"] == misses
+    assert np.allclose(np.sort_complex(first.h_norm.poles), np.sort_complex(second.h_norm.poles))
+
+    butter = ButterworthApprox()
+    butter.fpl, butter.fal, butter.Apl, butter.Aal, butter.gain = 1000, 2000, 1, 40, 0
+    butter.ord = 4
+    butter.compute()
+    assert PROTOTYPE_CACHE.get_statistics()["misses"] == misses + 1
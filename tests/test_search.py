@@ -0,0 +1,113 @@
+"""
+    Testing functions to verify the searching tools used by the approximators,
+    comparing them against closed-form results.
+"""
+
+# Project modules
+from app.approximators.approximator import MAXIMUM_ORDER
+from app.approximators.approximator import find_minimum_order
+from app.approximators.approximator import find_maximum_order
+from app.approximators.approximator import find_first_crossing
+from app.approximators.approximator import magnitude_response
+from app.approximators.approximator import group_delay_response
+from app.approximators.butterworth import ButterworthApprox
+from app.approximators.chebyshev_i import ChebyshevIApprox
+from app.approximators.chebyshev_ii import ChebyshevIIApprox
+from app.approximators.cauer import CauerApprox
+
+# Third-Party modules
+from scipy import signal
+import numpy as np
+
+# Python native modules
+from functools import partial
+
+
+def test_first_crossing():
+    for order in range(1, 10):
+        butterworth = signal.ZerosPolesGain(*signal.buttap(order))
+        for attenuation in [3, 20, 40]:
+            expected = (10 ** (attenuation / 10) - 1) ** (1 / (2 * order))
+            found = find_first_crossing(partial(magnitude_response, butterworth), -attenuation, 0.1, 100)
+            assert np.isclose(found, expected, rtol=1e-8)
+
+    butterworth = signal.ZerosPolesGain(*signal.buttap(3))
+    assert find_first_crossing(partial(magnitude_response, butterworth), -200, 0.1, 10) is None
+
+
+def test_minimum_order():
+    for answer in range(1, MAXIMUM_ORDER + 2):
+        for seed in range(1, MAXIMUM_ORDER + 1):
+            order, evaluations = find_minimum_order(lambda n: n >= answer, seed)
+            assert order == (answer if answer <= MAXIMUM_ORDER else None)
+            assert evaluations <= 2 * np.log2(MAXIMUM_ORDER) + 2
+
+    # An exact seed only needs to verify the previous order
+    assert find_minimum_order(lambda n: n >= 7, 7) == (7, 2)
+
+
+def test_cauer_order():
+    for wa in [1.5, 2, 4.5]:
+        for ap, aa in [(1, 20), (2, 50), (0.5, 80)]:
+            approximator = CauerApprox()
+            approximator.compute_normalised_by_template(ap, aa, 1, wa)
+            order, _ = signal.ellipord(1, wa, ap, aa, analog=True)
+            assert len(approximator.h_aux.poles) == order
+
+
+def test_selectivity_order():
+    template = {'type': 'low-pass', 'fpl': 1000, 'fal': 3000, 'Apl': 1, 'Aal': 40}
+    for approximator in (ButterworthApprox, ChebyshevIApprox, CauerApprox):
+        for q in (0.6, 0.9, 1.5, 3, 8):
+            designed = approximator()
+            designed.set_parameters(dict(template, q=q))
+            designed.compute()
+
+            # Highest order not exceeding the maximum Q, designing every order
+            expected = 0
+            for order in range(1, MAXIMUM_ORDER + 1):
+                fixed = approximator()
+                fixed.set_parameters(dict(template, ord=order))
+                fixed.compute()
+                if fixed.matches_selectivity(q, fixed.get_zpk()):
+                    expected = order
+            assert designed.ord == expected
+            assert designed.orders_evaluated < MAXIMUM_ORDER // 2
+            assert len(designed.get_zpk().poles) == expected
+
+
+def test_non_monotonic_selectivity():
+    # The maximum Q of Chebyshev II band-pass falls and then grows again with the order
+    template = {'type': 'band-pass', 'fpl': 4000, 'fpr': 6000, 'fal': 1000, 'far': 10000,
+                'Apl': 2, 'Apr': 2, 'Aal': 40, 'Aar': 40}
+    for q in (5, 10, 30):
+        designed = ChebyshevIIApprox()
+        designed.set_parameters(dict(template, q=q))
+        designed.compute()
+
+        expected = 0
+        for order in range(1, MAXIMUM_ORDER + 1):
+            fixed = ChebyshevIIApprox()
+            fixed.set_parameters(dict(template, ord=order))
+            fixed.compute()
+            if fixed.matches_selectivity(q, fixed.get_zpk()):
+                expected = order
+        assert expected > 1
+        assert designed.ord == expected
+        assert designed.matches_selectivity(q, designed.get_zpk())
+
+    # Orders 3 to 5 do not exceed, but neither does 9, so the scan finds the highest one
+    assert find_maximum_order(lambda n: n not in (3, 4, 5, 9))[0] == 9
+    assert find_maximum_order(lambda n: n < 2 or n > 12)[0] == 12
+    assert find_maximum_order(lambda n: True) == (None, MAXIMUM_ORDER)
+
+
+def test_group_delay():
+    # Bessel normalised by delay has unit group delay at DC, compared against the derivative of the phase
+    zeros, poles, gain = signal.bessel(6, 1, analog=True, norm='delay', output='zpk')
+    zpk = signal.ZerosPolesGain(np.append(zeros, -3), poles, gain)
+    w, h = signal.freqs_zpk(zpk.zeros, zpk.poles, zpk.gain, worN=np.linspace(0, 4, 40001))
+    numerical = -np.diff(np.unwrap(np.angle(h))) / np.diff(w)
+    analytic = group_delay_response(zpk, (w[1:] + w[:-1]) / 2)
+    assert np.allclose(analytic, numerical, atol=1e-6)
+    assert abs(group_delay_response(signal.ZerosPolesGain(zeros, poles, gain), [0])[0] - 1) < 1e-9
@@ -0,0 +1,26 @@
+# Third-party modules
+import numpy as np
+
+# filters-tool project modules
+from app.approximators.approximator import ApproximationErrorCode
+from app.approximators.chebyshev_i import ChebyshevIApprox
+from app.approximators.sweep import maximum_selectivity
+from app.approximators.sweep import sweep_approximation
+
+
+def test_sweep_matches_compute():
+    ranges = {'fal': [1200, 2000, 3000], 'Aal': [30, 50], 'q': [0, 2]}
+    template = {'type': 'low-pass', 'fpl': 1000, 'Apl': 1}
+    sweep = sweep_approximation(ChebyshevIApprox, ranges, template)
+    parallel = sweep_approximation(ChebyshevIApprox, ranges, template, parallel=True, max_workers=2)
+    assert sweep['order'].shape == (3, 2, 2)
+    assert np.all(sweep['order'] == parallel['order'])
+
+    for index in np.ndindex(sweep['order'].shape):
+        approximator = ChebyshevIApprox()
+        approximator.set_parameters(template)
+        approximator.set_parameters({name: values[index] for name, values in sweep['grid'].items()})
+        assert approximator.compute() is sweep['error_code'][index]
+        if sweep['error_code'][index] is ApproximationErrorCode.OK:
+            assert sweep['order'][index] == len(approximator.get_zpk().poles)
+            assert abs(sweep['max_q'][index] - maximum_selectivity(approximator.get_zpk())) < 1e-9